@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks
+
+Micro-benchmarks for the linear data structures. Run from this directory:
+
+    python3 benchmarks.py                      runs every benchmark
+    python3 benchmarks.py blocking_queue       runs only the named benchmark(s)
+
+Each benchmark prints one line per configuration.
+"""
+import random
+import sys
+import threading
+import time
+
+from priority_queue import BlockingPriorityQueue
+
+
+def bench_blocking_queue(threads=(1, 4, 16), items=10**5, maxsize=1000, batch=64):
+    """Throughput of BlockingPriorityQueue with equally many producer and
+        consumer threads, consuming with get and with get_many(batch).
+    """
+    print('blocking priority queue: producers/consumers, get items/s, '
+          'get_many items/s')
+    for t in threads:
+        rates = []
+        for many in (False, True):
+            q = BlockingPriorityQueue(maxsize=maxsize)
+            per_thread = items//t
+
+            def produce():
+                for _ in range(per_thread):
+                    q.put(random.random())
+
+            def consume():
+                left = per_thread
+                while left:
+                    if many:
+                        got = len(q.get_many(min(batch,left)))
+                    else:
+                        q.get()
+                        got = 1
+                    for _ in range(got):
+                        q.task_done()
+                    left -= got
+
+            workers = [threading.Thread(target=produce) for _ in range(t)]
+            workers += [threading.Thread(target=consume) for _ in range(t)]
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            q.join()
+            for w in workers:
+                w.join()
+            rates.append(per_thread*t/(time.perf_counter() - start))
+        print(f'{t:>4} {rates[0]:12.0f} {rates[1]:12.0f}')
+
+
+BENCHMARKS = {
+    'blocking_queue': bench_blocking_queue,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
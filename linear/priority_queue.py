@@ -13,10 +13,14 @@ Priority Queue:
     
     Operations:
         1. insert
-        2. delete
+        2. delete (pop the item with the highest priority)
         3. peek
         4. isEmpty
         5. isFull
+        
+    PriorityQueue supports a max or a min mode, an optional key function and
+    FIFO order between items of equal priority. BlockingPriorityQueue wraps it
+    for sharing between threads (blocking put/get, timeouts, capacity).
     
     Time complexity: The complexity is identical to the heap.
                     An insertion costs at most O(lg(n)) (requires heapifing the list after insertion)
@@ -34,10 +38,192 @@ Priority Queue:
 
 
 ## Priority queue - Implementation using the heap data structure
-from binary_heap import Heap 
+import os
+import sys
+import threading
+import time
+
+try:
+    from tree_based.binary_heap import Heap
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 os.pardir,'tree_based'))
+    from binary_heap import Heap
+
+
+class Empty(Exception):
+    """Raised by BlockingPriorityQueue.get when no item arrives in time."""
+
+
+class Full(Exception):
+    """Raised by BlockingPriorityQueue.put when no slot frees up in time."""
+
+
+class _MinEntry(tuple):
+    """A (key, count, item) tuple which the max heap orders smallest first."""
+    __slots__ = ()
+    
+    def __gt__(self,other):
+        return tuple.__lt__(self,other)
+
+
+class PriorityQueue(object):
+    """A priority queue on top of binary_heap.Heap.
+    
+        Every item is stored as an entry (priority, count, item), where count
+        is an insertion counter. Entries are compared by priority and then by
+        count, so items with equal priorities leave in insertion order (FIFO)
+        and the items themselves are never compared.
+    """
+    
+    def __init__(self,items=(),key=None,mode='max'):
+        """ Creates a priority queue.
         
-L = [7,7,12,2,8,9,10]
-p = Heap(L)
+            Args:
+                items: iterable, initial items (heapified in O(n))
+                key: function, computes an item's priority once, on insertion.
+                    The item is its own priority if key is None.
+                mode: 'max' pops the largest priority first, 'min' the smallest.
+        """
+        if mode not in ('max','min'):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.key = key
+        self.mode = mode
+        self.count = 0
+        self.heap = Heap([self._entry(item) for item in items])
+        
+    def __len__(self):
+        return self.heap.n
+    
+    def __bool__(self):
+        return self.heap.n > 0
+    
+    def __str__(self):
+        return str([entry[2] for entry in self.heap.L])
+    
+    def _entry(self,item):
+        """Wraps item in a heap entry, computing its priority."""
+        priority = item if self.key is None else self.key(item)
+        self.count += 1
+        if self.mode == 'max':
+            return (priority,-self.count,item)
+        return _MinEntry((priority,self.count,item))
+    
+    def insert(self,item):
+        """Inserts an item in O(log(n))."""
+        self.heap.insert(self._entry(item))
+        
+    def peek(self):
+        """Returns the item with the highest priority in O(1)."""
+        if self.heap.n == 0:
+            raise IndexError('peek from an empty priority queue')
+        return self.heap.L[0][2]
+    
+    def pop(self):
+        """Removes and returns the item with the highest priority in O(log(n))."""
+        if self.heap.n == 0:
+            raise IndexError('pop from an empty priority queue')
+        return self.heap.extract_max()[2]
+    
+    def is_empty(self):
+        return self.heap.n == 0
+
+
+class BlockingPriorityQueue(object):
+    """A thread-safe PriorityQueue for producer/consumer pools.
+    
+        All state is guarded by one lock. Waiting threads sleep on conditions
+        of that lock instead of polling. put blocks while the queue holds
+        maxsize items (maxsize <= 0 means unbounded), get blocks while it is
+        empty. As with queue.Queue, timeouts raise Full/Empty,
+        and task_done/join let a producer wait until every item was processed.
+    """
+    
+    def __init__(self,maxsize=0,key=None,mode='max'):
+        self.maxsize = maxsize
+        self.queue = PriorityQueue(key=key,mode=mode)
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self.all_tasks_done = threading.Condition(self.mutex)
+        self.unfinished_tasks = 0
+        
+    def __len__(self):
+        with self.mutex:
+            return len(self.queue)
+        
+    def _wait(self,condition,predicate,block,timeout,error):
+        """Waits on condition (with the lock held) until predicate() is True.
+            Raises error if block is False or the timeout expires first.
+        """
+        if predicate():
+            return
+        if not block:
+            raise error
+        if timeout is None:
+            while not predicate():
+                condition.wait()
+        elif timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        else:
+            deadline = time.monotonic() + timeout
+            while not predicate():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise error
+                condition.wait(remaining)
+        
+    def put(self,item,block=True,timeout=None):
+        """Inserts item, waiting for a free slot if the queue is full."""
+        with self.not_full:
+            if self.maxsize > 0:
+                self._wait(self.not_full,
+                           lambda: len(self.queue) < self.maxsize,
+                           block,timeout,Full)
+            self.queue.insert(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+            
+    def get(self,block=True,timeout=None):
+        """Removes and returns the item with the highest priority, waiting for
+            an item if the queue is empty.
+        """
+        with self.not_empty:
+            self._wait(self.not_empty,lambda: len(self.queue) > 0,
+                       block,timeout,Empty)
+            item = self.queue.pop()
+            self.not_full.notify()
+            return item
+        
+    def get_many(self,n,block=True,timeout=None):
+        """Removes and returns up to n items, highest priority first, under a
+            single acquisition of the lock. Waits only until the queue holds
+            at least one item. n must be at least 1.
+        """
+        if n < 1:
+            raise ValueError('n must be at least 1')
+        with self.not_empty:
+            self._wait(self.not_empty,lambda: len(self.queue) > 0,
+                       block,timeout,Empty)
+            items = [self.queue.pop() for _ in range(min(n,len(self.queue)))]
+            self.not_full.notify(len(items))
+            return items
+        
+    def task_done(self):
+        """Marks one item returned by get (or get_many) as processed."""
+        with self.all_tasks_done:
+            unfinished = self.unfinished_tasks - 1
+            if unfinished < 0:
+                raise ValueError('task_done() called too many times')
+            if unfinished == 0:
+                self.all_tasks_done.notify_all()
+            self.unfinished_tasks = unfinished
+            
+    def join(self):
+        """Blocks until task_done was called for every item put."""
+        with self.all_tasks_done:
+            while self.unfinished_tasks:
+                self.all_tasks_done.wait()
 
 
 class Deque(object):
@@ -115,6 +301,11 @@ class Deque(object):
             return condition1 or condition2
             
 
+## Check PriorityQueue
+# p = PriorityQueue([7,7,12,2,8,9,10],mode='min')
+# p.insert(1)
+# print(p.peek(), p.pop(), len(p))
+
 ## Check Deque
 # d = Deque(5)
 
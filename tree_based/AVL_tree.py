@@ -5,37 +5,59 @@ AVL tree
 
 A data structure which maintains a balanced binary search tree.
 Search, insert, delete, find min/max, find smallest/largest are O(log(N)).
-And building the AVL takes O(N*log(N)) running time.
+And building the AVL takes O(N*log(N)) running time, or O(N) from sorted keys
+with from_sorted.
+
+Every node also stores the size of its subtree, which gives order statistics
+in O(log(N)): rank (number of smaller keys), select (the i-th smallest key)
+and count_range (number of keys in [lo, hi]).
+
+Batches of sorted keys are handled by insert_many, delete_many and find_many.
+The first two split the tree at the middle key of the batch and join the two
+sides back (join and split run in time proportional to the height
+difference), which takes O(m*log(N/m + 1)) for m keys instead of the
+O(m*log(N)) of m single operations.
 """
-from BST import BSTNode, BST
+from bisect import bisect_left, bisect_right
+
+try:
+    from .BST import BSTNode, BST
+    from . import snapshot
+except ImportError:
+    from BST import BSTNode, BST
+    import snapshot
 
        
        
                 
 class AVLNode(BSTNode):
+    __slots__ = ('height','size')
     
     def __init__(self,key):
         """Create as a node which will be inserted into the AVL tree"""
         BSTNode.__init__(self,key)  
         self.height = 0
+        self.size = 1
         
     def update_subtree_info(self):
         """Updates the nodes info"""
         self.height = self.updated_height()
+        self.size = 1 + size(self.left) + size(self.right)
     
     def updated_height(self):
         """Updates the node's height"""
-        return 1 + max((self.left and self.left.height) or -1,
-                       (self.right and self.right.height) or -1)
+        return 1 + max(height(self.left),height(self.right))
         
         
-    def check_ri(self):
+    def check_node_ri(self):
         """Checks the representation invariant of the AVL node"""
         if self.height != self.updated_height():
             raise NameError('RI is violated by wrong node height')
         if abs(height(self.left)-height(self.right)) >= 2:
             raise NameError('RI violated by unbalanced node height')
-        return BSTNode.check_ri(self)
+        if self.size != 1 + size(self.left) + size(self.right):
+            raise NameError('RI is violated by wrong subtree size')
+        return BSTNode.check_node_ri(self)
 
    
 
@@ -46,7 +68,236 @@ class AVL(BST):
         """Initiates an AVL tree"""
         BST.__init__(self,node_class)
         
+    def __len__(self):
+        return size(self.root)
+    
+    @classmethod
+    def from_sorted(cls,items,**kwargs):
+        """Builds a perfectly balanced AVL tree from items with strictly
+            increasing keys in O(N), instead of O(N*log(N)) for repeated
+            inserts. The items are keys (pairs for map subclasses, see
+            new_node). kwargs go to the constructor.
+        """
+        tree = cls(**kwargs)
+        items = tree.check_items(items)
+        tree.root = tree.build(items,0,len(items))
+        return tree
+    
+    def item_key(self,item):
+        """Returns the key of an item given to from_sorted and the batch
+            methods. The items of an AVL are its keys.
+        """
+        return item
+    
+    def new_node(self,item):
+        """Returns a new detached node for an item. Subclasses whose nodes hold
+            more than a key extend it.
+        """
+        return self.node_class(item)
+    
+    def check_items(self,items):
+        """Returns items as a list, checking that their keys are strictly
+            increasing
+        """
+        items = list(items)
+        check_increasing([self.item_key(item) for item in items])
+        return items
+    
+    def build(self,items,lo,hi):
+        """Builds a perfectly balanced subtree of items[lo:hi] and returns its
+            root. The middle item becomes the root and both halves are built
+            the same way, bottom up (the recursion depth is only log(N)).
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi)//2
+        node = self.new_node(items[mid])
+        node.left = self.build(items,lo,mid)
+        node.right = self.build(items,mid + 1,hi)
+        if node.left is not None:
+            node.left.parent = node
+        if node.right is not None:
+            node.right.parent = node
+        node.update_subtree_info()
+        return node
+    
+    def join(self,left,node,right):
+        """Joins two detached subtrees and a detached node, all keys in left <
+            node.key < all keys in right, into one AVL subtree and returns its
+            root, in O(|height(left) - height(right)| + 1).
+        """
+        if height(left) > height(right) + 1:
+            # Walk down the right spine of left to a subtree as high as right,
+            # put node there with both of them as children and rebalance.
+            parent, c = left, left.right
+            while height(c) > height(right) + 1:
+                parent, c = c, c.right
+            self.link(node,c,right)
+            parent.right = node
+            node.parent = parent
+            return self.rebalance_subtree(left,parent)
+        if height(right) > height(left) + 1:
+            parent, c = right, right.left
+            while height(c) > height(left) + 1:
+                parent, c = c, c.left
+            self.link(node,left,c)
+            parent.left = node
+            node.parent = parent
+            return self.rebalance_subtree(right,parent)
+        self.link(node,left,right)
+        node.parent = None
+        return node
+    
+    def link(self,node,left,right):
+        """Makes left and right the children of node."""
+        node.left = left
+        node.right = right
+        if left is not None:
+            left.parent = node
+        if right is not None:
+            right.parent = node
+        node.update_subtree_info()
+    
+    def rebalance_subtree(self,root,node):
+        """Rebalances the detached subtree rooted at root from node upwards and
+            returns its new root.
+        """
+        # The rotations relink self.root when they reach the top, so the
+        # detached subtree stands in for the tree's root meanwhile.
+        tree_root = self.root
+        self.root = root
+        try:
+            self.rebalance(node)
+            return self.root
+        finally:
+            self.root = tree_root
+    
+    def split(self,node,key):
+        """Splits the detached subtree rooted at node into (left, found, right):
+            the subtrees of the keys < key and > key, and the node with key (or
+            None). Takes O(height(node)).
+        """
+        if node is None:
+            return None, None, None
+        left, right = node.left, node.right
+        if left is not None:
+            left.parent = None
+        if right is not None:
+            right.parent = None
+        node.left = node.right = node.parent = None
+        if key == node.key:
+            node.update_subtree_info()
+            return left, node, right
+        if key < node.key:
+            left, found, middle = self.split(left,key)
+            return left, found, self.join(middle,node,right)
+        middle, found, right = self.split(right,key)
+        return self.join(left,node,middle), found, right
+    
+    def split_min(self,node):
+        """Removes the minimum from the detached subtree rooted at node and
+            returns (the new root, the minimum's node).
+        """
+        left, right = node.left, node.right
+        node.left = node.right = node.parent = None
+        if right is not None:
+            right.parent = None
+        if left is None:
+            node.update_subtree_info()
+            return right, node
+        left.parent = None
+        left, minimum = self.split_min(left)
+        return self.join(left,node,right), minimum
+    
+    def join2(self,left,right):
+        """Joins two detached subtrees, all keys in left < all keys in right."""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        right, minimum = self.split_min(right)
+        return self.join(left,minimum,right)
+    
+    def set_item(self,node,item):
+        """Applies an item of insert_many to the detached node which already
+            holds its key. An AVL has nothing to update.
+        """
+        pass
+    
+    def insert_many(self,items):
+        """Inserts a batch of items with strictly increasing keys (keys for an
+            AVL, see new_node). The tree is split at the middle key of the
+            batch, both halves of the batch are inserted into both sides
+            recursively and the sides are joined back, which takes
+            O(m*log(N/m + 1)) for a batch of m items.
+        """
+        items = self.check_items(items)
+        
+        def union(node,lo,hi):
+            if lo >= hi:
+                return node
+            if node is None:
+                return self.build(items,lo,hi)
+            mid = (lo + hi)//2
+            left, found, right = self.split(node,self.item_key(items[mid]))
+            if found is None:
+                found = self.new_node(items[mid])
+            else:
+                self.set_item(found,items[mid])
+            return self.join(union(left,lo,mid),found,union(right,mid + 1,hi))
         
+        self.root = union(self.root,0,len(items))
+        if self.root is not None:
+            self.root.parent = None
+            
+    def delete_many(self,keys):
+        """Deletes a batch of strictly increasing keys, in O(m*log(N/m + 1)) as
+            insert_many, and returns the number of keys which were deleted.
+        """
+        keys = check_increasing(keys)
+        deleted = 0
+        
+        def difference(node,lo,hi):
+            nonlocal deleted
+            if lo >= hi or node is None:
+                return node
+            mid = (lo + hi)//2
+            left, found, right = self.split(node,keys[mid])
+            if found is not None:
+                deleted += 1
+            return self.join2(difference(left,lo,mid),difference(right,mid + 1,hi))
+        
+        self.root = difference(self.root,0,len(keys))
+        if self.root is not None:
+            self.root.parent = None
+        return deleted
+    
+    def find_many(self,keys):
+        """Looks up a batch of non-decreasing keys in one traversal: at every
+            node the batch is divided with bisect between the two subtrees, so
+            shared path prefixes are walked once. Returns the list of nodes
+            found (None for absent keys), aligned with keys. In CPython the
+            bisect bookkeeping makes it slower than a loop of find, by about
+            2x for batches of 10 keys and 10-20% from 1e3 keys up.
+        """
+        keys = check_increasing(keys,strict=False)
+        found = [None]*len(keys)
+        stack = [(self.root,0,len(keys))]
+        while stack:
+            node, lo, hi = stack.pop()
+            if node is None or lo >= hi:
+                continue
+            if hi - lo == 1:
+                # A single key left: a plain descent, without bisecting.
+                found[lo] = node.find(keys[lo])
+                continue
+            i = bisect_left(keys,node.key,lo,hi)
+            j = bisect_right(keys,node.key,i,hi)
+            for k in range(i,j):
+                found[k] = node
+            stack.append((node.left,lo,i))
+            stack.append((node.right,j,hi))
+        return found
         
     def insert(self,key):
         """Inserts a node to the AVL tree and rebalances the tree"""
@@ -55,11 +306,10 @@ class AVL(BST):
         return inserted_node
         
         
-    def delete(self,key):
-        """Deletes a node with node.key = key from the tree"""
-        deleted_node = BST.delete(self, key)
-        if deleted_node:
-            self.rebalance(deleted_node.parent)
+    def delete_node(self,node):
+        """Deletes node from the tree and rebalances the tree"""
+        deleted_node, lowest_changed = self.splice_out(node)
+        self.rebalance(lowest_changed)
         return deleted_node
         
     def rebalance(self,node):
@@ -73,7 +323,7 @@ class AVL(BST):
             #case 1: the left child of node x is heavier than the right child.
             #       inserting into the left child may violate the AVL tree
             if height(node.left) >= 2 + height(node.right):
-                if height(node.left) >= height(node.right):
+                if height(node.left.left) >= height(node.left.right):
                     self.right_rotate(node)
                 else:
                     self.left_rotate(node.left)
@@ -81,7 +331,7 @@ class AVL(BST):
             
             #case 2: analogous to case 1 but with left -> right
             if height(node.right) >= 2 + height(node.left):
-                if height(node.right) >= height(node.left):
+                if height(node.right.right) >= height(node.right.left):
                     
                     self.left_rotate(node)
                 else:
@@ -92,47 +342,78 @@ class AVL(BST):
         
          
            
-    def left_rotate(self,y):
-        """Performs a left rotation w.r.t node y"""
-        x = y.right
-        x.parent = y.parent
-        if y.parent == None:
-            self.root = x
-        else:
-            if y.parent.left == y:
-                y.parent.left = x
+    def save(self,path):
+        """Saves the keys, in sorted order, to a binary snapshot file."""
+        snapshot.save(path,self.to_sorted_list(),snapshot.SORTED)
+        
+    @classmethod
+    def load(cls,path,**kwargs):
+        """Builds a tree from a snapshot file in O(N), with from_sorted. Only
+            load trusted files: snapshots of non-numeric keys are pickles.
+        """
+        return cls.from_sorted(snapshot.load(path,snapshot.SORTED),**kwargs)
+        
+    def count_smaller(self,key,inclusive=False):
+        """Returns the number of keys < key (<= key if inclusive) in O(log(N))."""
+        count = 0
+        node = self.root
+        while node is not None:
+            if key < node.key or (key == node.key and not inclusive):
+                node = node.left
             else:
-                y.parent.right = x
-        y.parent = x
-        y.right = x.left
-        if y.right is not None:
-           y.right.parent = y
-        x.left = y
-        #update the information
-        x.update_subtree_info()
-        y.update_subtree_info()
-        
-    def right_rotate(self,x):
-        """Performs a right rotation w.r.t node y"""
-        y = x.left
-        y.parent = x.parent
-        if y.parent == None:
-            self.root = y
-        else:
-            if x.parent.left == x:
-                x.parent.left = y
+                count += 1 + size(node.left)
+                node = node.right
+        return count
+    
+    def rank(self,key):
+        """Returns the number of keys smaller than key (the key need not be in
+            the tree).
+        """
+        return self.count_smaller(key)
+    
+    def select(self,i):
+        """Returns the node with the i-th smallest key (counting from 0)."""
+        if not 0 <= i < size(self.root):
+            raise IndexError('select index out of range')
+        node = self.root
+        while True:
+            left_size = size(node.left)
+            if i < left_size:
+                node = node.left
+            elif i == left_size:
+                return node
             else:
-                x.parent.right = y
-        x.parent = y
-        x.left = y.right
-        if x.left is not None:
-           x.left.parent = x
-        y.right = x
-        #update the information
-        x.update_subtree_info()
-        y.update_subtree_info()
+                i -= left_size + 1
+                node = node.right
+                
+    def count_range(self,lo,hi):
+        """Returns the number of keys k with lo <= k <= hi."""
+        if hi < lo:
+            return 0
+        return self.count_smaller(hi,inclusive=True) - self.count_smaller(lo)
         
         
+def check_increasing(keys,strict=True):
+    """Returns keys as a list, checking that they are strictly increasing
+        (non-decreasing if not strict)
+    """
+    keys = list(keys)
+    for i in range(1,len(keys)):
+        if strict and not keys[i-1] < keys[i]:
+            raise ValueError('The keys must be strictly increasing')
+        if not strict and keys[i] < keys[i-1]:
+            raise ValueError('The keys must be sorted')
+    return keys
+
+
+def size(node):
+    """Returns the number of nodes in the subtree rooted at node"""
+    if node is None:
+        return 0
+    else:
+        return node.size
+    
+    
 def height(node):
     """Returns the height of the the node"""
     if node is None:
@@ -142,14 +423,6 @@ def height(node):
     
     
     
-l = []    
-def inorder(node):
-    if node != None:     
-       inorder(node.left)
-       l.append(node.key)
-       inorder(node.right)
-
-    
 """    
 if __name__ == '__main__':
     
@@ -160,9 +433,7 @@ if __name__ == '__main__':
         tree.insert(key)
 
     ## insert check
-    l = []    
-    inorder(tree.root)
-    print(f'tree transversal: {l}')
+    print(f'tree transversal: {list(tree)}')
     for key in keys:
         node = tree.find(key)
         node.check_ri()
@@ -172,9 +443,7 @@ if __name__ == '__main__':
     tree.delete(10)
     tree.delete(11)
     tree.delete(0)
-    l = []    
-    inorder(tree.root)
-    print(f'tree transversal: {l}')
+    print(f'tree transversal: {list(tree)}')
     for key in [2,6,18]:
         node = tree.find(key)
         node.check_ri()
@@ -9,7 +9,13 @@ The hieght of the tree is the maximum number of edges between the leaf and
 """
 
 class BSTNode(object):
-    """A node in a BST tree"""
+    """A node in a BST tree.
+        The fields are stored in __slots__ rather than a per-instance __dict__,
+        which roughly halves the memory of every node. Subclasses add their
+        own fields with __slots__ (or get a __dict__ if they don't).
+    """
+    __slots__ = ('key','left','right','parent')
+    
     def __init__(self,k):
         """ Creates a node.
             
@@ -33,34 +39,29 @@ class BSTNode(object):
     
     def find(self,k):
         """Finds and returns the node with key k from the subtree rooted at this node."""
-        if self.key == k:
-            return self
-        elif k < self.key:
-            if self.left is None:
-                return None
-            else:
-                return self.left.find(k)
-        else:
-            if self.right is None:
-                return None
+        node = self
+        while node is not None:
+            if k == node.key:
+                return node
+            elif k < node.key:
+                node = node.left
             else:
-                return self.right.find(k)
+                node = node.right
+        return None
     
     def find_min(self):
         """Finds and returns the minimum element of the BST rooted at the node"""
-        # Base case:
-        if self.left is None:
-            return self
-        else: 
-            return self.left.find_min()
+        node = self
+        while node.left is not None:
+            node = node.left
+        return node
     
     def find_max(self):
-        """Finds and returns the minimum element of the BST rooted at the node"""
-        # Base case:
-        if self.right == None:
-            return self
-        else: 
-            return self.right.find_max()
+        """Finds and returns the maximum element of the BST rooted at the node"""
+        node = self
+        while node.right is not None:
+            node = node.right
+        return node
     
     def insert(self,node):
         """Inserts a node into the subtree rooted at this node.
@@ -70,44 +71,45 @@ class BSTNode(object):
             node: BSTNode, the node to be inserted
         
         Returns:
-            node: the inserted node
+            node: the inserted node, or the existing node with the same key
         """
-        if node.key < self.key:
-            if self.left is not None:
-                return self.left.insert(node)
-            node.parent = self
-            self.left = node
-            return node
-
-        elif node.key > self.key:          
-            if self.right is not None:
-                return self.right.insert(node)
-            node.parent = self
-            self.right = node
-            return node
-        return self
+        key = node.key
+        current = self
+        while True:
+            if key < current.key:
+                if current.left is None:
+                    node.parent = current
+                    current.left = node
+                    return node
+                current = current.left
+            elif key > current.key:
+                if current.right is None:
+                    node.parent = current
+                    current.right = node
+                    return node
+                current = current.right
+            else:
+                return current
             
     def next_larger(self):
-        """Finds the node with the next larger key"""
-        # Base case: the right child of the node is None
-        if self.right == None:
-            if self.parent == None or self == self.parent.right:
-                raise NameError('This is the largest key')
-            else:
-                return self.parent
-        else: 
+        """Finds the node with the next larger key, None for the largest key"""
+        if self.right is not None:
             return self.right.find_min()
+        # Go up until we arrive from a left child, whose parent is next
+        node = self
+        while node.parent is not None and node is node.parent.right:
+            node = node.parent
+        return node.parent
         
     def next_smaller(self):
-        """Finds the node with the next smaller key"""
-        # Base case: the right childe of the node is None
-        if self.left == None:
-            if self.parent == None or self == self.parent.left:
-                raise NameError('This is the smallest key')
-            else:
-                return self.parent
-        else: 
-            return self.left.find_max()    
+        """Finds the node with the next smaller key, None for the smallest key"""
+        if self.left is not None:
+            return self.left.find_max()
+        # Go up until we arrive from a right child, whose parent is next
+        node = self
+        while node.parent is not None and node is node.parent.left:
+            node = node.parent
+        return node.parent
     
         
                 
@@ -137,9 +139,16 @@ class BSTNode(object):
     
     def delete(self):
         """
-            Deletes this node from the BST.
+            Deletes this node from the BST and returns it.
+        """
+        self.splice_out()
+        return self
+    
+    def splice_out(self):
+        """
+            Deletes this node from the BST and returns the lowest node whose
+            subtree changed, which is where a rebalancing walk should start.
         """
-        y = self.next_larger()
         #cases 1 and 2: one of the self's children is None or both
         if self.left is None or self.right is None:
             if self is self.parent.left:
@@ -150,8 +159,10 @@ class BSTNode(object):
                 self.parent.right = self.right or self.left
                 if self.parent.right is not None:
                     self.parent.right.parent = self.parent
+            return self.parent
+        y = self.right.find_min()
         #case 3: self.right.left == None (meaning the next_larger(self) = self.right)
-        elif  y == self.right:
+        if  y == self.right:
             y.left = self.left
             self.left.parent = y
             y.parent = self.parent
@@ -159,10 +170,13 @@ class BSTNode(object):
                 self.parent.left = y
             else:
                 self.parent.right = y
+            lowest_changed = y
         #case 4: self.right.left != None
         else:        
+            lowest_changed = y.parent
             y.parent.left = y.right
-            y.right.parent = y.parent
+            if y.right is not None:
+                y.right.parent = y.parent
             
             y.right  = self.right
             self.right.parent = y
@@ -174,7 +188,7 @@ class BSTNode(object):
                 self.parent.left = y
             else:
                 self.parent.right = y   
-        return self    
+        return lowest_changed
             
                  
         
@@ -182,23 +196,38 @@ class BSTNode(object):
         
     def check_ri(self):
         """
-        Checks the representation invariant (RI) of the AVL tree. 
-        Namely, that the tree is a binary search tree:
+        Checks the representation invariant (RI) of the subtree rooted at this
+        node. Namely, that the tree is a binary search tree:
         node.left.key < node.key && node.right.key > node.key for every node
-        in the tree.
+        in the tree, and that every node satisfies check_node_ri.
         
         """
-        # Base case: if the node is a leaf it satisfies the representation invariant
-        if self.left == None and self.right == None:
-            return True
-        elif self.left == None and self.right.key > self.key:
-            return self.right.check_ri()
-        elif self.right == None and self.left.key < self.key:
-            return self.left.check_ri()
-        elif self.right.key > self.key and self.left.key < self.key:
-            return self.left.check_ri() and self.right.check_ri()
-        else: 
-            return False
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node.check_node_ri():
+                return False
+            if node.left is not None:
+                if not node.left.key < node.key:
+                    return False
+                stack.append(node.left)
+            if node.right is not None:
+                if not node.right.key > node.key:
+                    return False
+                stack.append(node.right)
+        return True
+    
+    def update_subtree_info(self):
+        """Recomputes information the node keeps about its subtree after the
+            subtree changed (e.g. by a rotation). A plain BSTNode keeps none.
+        """
+        pass
+    
+    def check_node_ri(self):
+        """Checks invariants which involve only this node and its children.
+            Subclasses which store extra information in the node extend it.
+        """
+        return True
 
 class BST(object):
     """Creates a binary search tree"""
@@ -234,30 +263,246 @@ class BST(object):
     def delete(self,key):
         node = self.find(key)
         if node:
-            if node == self.root:
-                pseudo_root = self.node_class(None)
-                pseudo_root.left = self.root 
-                self.root.parent = pseudo_root
-                deleted_node = node.delete()
-                self.root = pseudo_root.left
-                return deleted_node
-            else:
-                return node.delete()
+            return self.delete_node(node)
         else:
             return None
         
+    def delete_node(self,node):
+        """Deletes node, which must belong to this tree, and returns it."""
+        return self.splice_out(node)[0]
+    
+    def splice_out(self,node):
+        """Deletes node, which must belong to this tree. Returns the deleted
+            node and the lowest node whose subtree changed (None if that is
+            only the root pointer), see BSTNode.splice_out.
+        """
+        if node == self.root:
+            pseudo_root = self.node_class(None)
+            pseudo_root.left = self.root 
+            self.root.parent = pseudo_root
+            lowest_changed = node.splice_out()
+            self.root = pseudo_root.left
+            if self.root is not None:
+                self.root.parent = None
+            if node.parent is pseudo_root:
+                node.parent = None
+            if lowest_changed is pseudo_root:
+                lowest_changed = None
+            return node, lowest_changed
+        else:
+            return node, node.splice_out()
+        
+    def left_rotate(self,y):
+        """Performs a left rotation w.r.t node y"""
+        x = y.right
+        x.parent = y.parent
+        if y.parent == None:
+            self.root = x
+        else:
+            if y.parent.left == y:
+                y.parent.left = x
+            else:
+                y.parent.right = x
+        y.parent = x
+        y.right = x.left
+        if y.right is not None:
+           y.right.parent = y
+        x.left = y
+        #update the information, y is now below x
+        y.update_subtree_info()
+        x.update_subtree_info()
+        
+    def right_rotate(self,x):
+        """Performs a right rotation w.r.t node y"""
+        y = x.left
+        y.parent = x.parent
+        if y.parent == None:
+            self.root = y
+        else:
+            if x.parent.left == x:
+                x.parent.left = y
+            else:
+                x.parent.right = y
+        x.parent = y
+        x.left = y.right
+        if x.left is not None:
+           x.left.parent = x
+        y.right = x
+        #update the information
+        x.update_subtree_info()
+        y.update_subtree_info()
+        
     def successor(self,key):
-        node = self.find(key)
-        return node and node.next_larger()        
+        """Returns the node with the smallest key larger than key (which need
+            not be in the tree), or None.
+        """
+        return self.higher(key)
+    
+    def _bound(self,key,below,inclusive):
+        """Descends once and returns the node with the largest key < key
+            (below) or the smallest key > key (not below), also accepting key
+            itself if inclusive.
+        """
+        best = None
+        node = self.root
+        while node is not None:
+            if key == node.key and inclusive:
+                return node
+            if (node.key < key) == below and node.key != key:
+                best = node
+                node = node.right if below else node.left
+            else:
+                node = node.left if below else node.right
+        return best
+    
+    def floor(self,key):
+        """Returns the node with the largest key <= key, or None."""
+        return self._bound(key,True,True)
+    
+    def ceiling(self,key):
+        """Returns the node with the smallest key >= key, or None."""
+        return self._bound(key,False,True)
+    
+    def lower(self,key):
+        """Returns the node with the largest key < key, or None."""
+        return self._bound(key,True,False)
+    
+    def higher(self,key):
+        """Returns the node with the smallest key > key, or None."""
+        return self._bound(key,False,False)
+    
+    def nearest(self,key):
+        """Returns the node whose key is closest to key (numeric keys), the
+            smaller one on a tie, or None if the tree is empty.
+        """
+        below = self.floor(key)
+        above = self.ceiling(key)
+        if below is None or above is None:
+            return below or above
+        return below if key - below.key <= above.key - key else above
+    
+    def cursor(self,key=None):
+        """Returns a Cursor positioned on the smallest key >= key (on the
+            minimum if key is None).
+        """
+        cursor = Cursor(self)
+        if key is None:
+            cursor.node = self.min()
+        else:
+            cursor.seek(key)
+        return cursor
+        
+    def __iter__(self):
+        """Yields the keys in ascending order."""
+        return inorder(self.root)
+    
+    def __reversed__(self):
+        """Yields the keys in descending order."""
+        for node in iter_nodes(self.root,reverse=True):
+            yield node.key
+    
+    def to_sorted_list(self):
+        """Returns a list of the keys in ascending order, in O(n) and without
+            recursion.
+        """
+        return list(self)
+    
+    def keys(self):
+        """Returns a list of the keys in ascending order."""
+        return self.to_sorted_list()
+    
+    def iter_range(self,lo=None,hi=None,inclusive=True):
+        """Lazily yields the keys k with lo <= k <= hi in ascending order.
+        
+        Args:
+            lo, hi: the bounds of the range, None for an unbounded end.
+            inclusive: bool, or a pair of bools for (lo, hi). Whether keys
+                equal to the bound are included.
+        """
+        for node in iter_nodes(self.root,lo,hi,inclusive):
+            yield node.key
   
 
-l = []         
+class Cursor(object):
+    """A position in a BST which can move to the next or previous key.
+    
+        A step follows the parent pointers (next_larger/next_smaller), so a
+        sequence of k steps costs O(h + k): O(1) amortized per step.
+        The cursor stays valid until the tree is modified.
+    """
+    def __init__(self,tree):
+        self.tree = tree
+        self.node = None
+        
+    @property
+    def key(self):
+        """The key under the cursor, None if the cursor ran off the tree."""
+        return None if self.node is None else self.node.key
+        
+    def seek(self,key):
+        """Moves to the smallest key >= key and returns it (None if none)."""
+        self.node = self.tree.ceiling(key)
+        return self.key
+    
+    def next(self):
+        """Moves to the next larger key and returns it (None at the end)."""
+        if self.node is not None:
+            self.node = self.node.next_larger()
+        return self.key
+    
+    def prev(self):
+        """Moves to the next smaller key and returns it (None at the start)."""
+        if self.node is not None:
+            self.node = self.node.next_smaller()
+        return self.key
+
+
+def iter_nodes(node,lo=None,hi=None,inclusive=True,reverse=False):
+    """Lazily yields the nodes of the subtree rooted at node whose keys are in
+        the range [lo, hi], in ascending order (descending if reverse).
+        
+        An explicit stack holds the path to the next node, so the generator
+        uses O(h) memory and yielding k nodes takes O(h + k) time. The tree
+        must not be modified while the generator is running.
+    """
+    if inclusive is True or inclusive is False:
+        inclusive = (inclusive,inclusive)
+    lo_inclusive, hi_inclusive = inclusive
+
+    def above_lo(key):
+        return lo is None or key > lo or (lo_inclusive and key == lo)
+
+    def below_hi(key):
+        return hi is None or key < hi or (hi_inclusive and key == hi)
+
+    if reverse:
+        in_bound, out_of_bound = below_hi, above_lo
+    else:
+        in_bound, out_of_bound = above_lo, below_hi
+    # Push the path to the first node inside the starting bound. A node
+    # outside it is skipped together with its near subtree.
+    stack = []
+    while node is not None:
+        if in_bound(node.key):
+            stack.append(node)
+            node = node.right if reverse else node.left
+        else:
+            node = node.left if reverse else node.right
+    while stack:
+        node = stack.pop()
+        if not out_of_bound(node.key):
+            return
+        yield node
+        node = node.left if reverse else node.right
+        while node is not None:
+            stack.append(node)
+            node = node.right if reverse else node.left
+
+
 def inorder(node):
-    if node != None:     
-       #print(node.key)
-       inorder(node.left)
-       l.append(node.key)
-       inorder(node.right)
+    """Lazily yields the keys of the subtree rooted at node in ascending order."""
+    for node in iter_nodes(node):
+        yield node.key
        
        
 """     
@@ -288,9 +533,7 @@ if __name__ == '__main__':
     tree.delete(10)
     tree.delete(11)
     tree.delete(0)
-    l = []    
-    inorder(tree.root)
-    print(f'tree transversal: {l}')
+    print(f'tree transversal: {list(tree)}')
     print(f'RI check: {tree.check_ri()}')    
         
     ### BSTNode check                    
@@ -304,9 +547,7 @@ if __name__ == '__main__':
 
     ## insert check
     
-    l = []    
-    inorder(root)
-    print(f'tree transversal: {l}')
+    print(f'tree transversal: {list(inorder(root))}')
     print(f'RI check: {root.check_ri()}')
     
     ## delete check
@@ -315,9 +556,7 @@ if __name__ == '__main__':
     root.left.delete()
     print(f'deleted node: {root.left.key}')
     root.left.delete()
-    l = []
-    inorder(root)
-    print(f'tree transversal: {l}')
+    print(f'tree transversal: {list(inorder(root))}')
     print(f'RI check: {root.check_ri()}')
     
     root.insert(BSTNode(6))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aggregate tree
+
+A SortedDict in which every node also stores the aggregate of the values in
+its subtree, for a monoid given by the caller: an associative combine
+function with an identity element (e.g. + and 0, min and infinity).
+The aggregate is refreshed by update_subtree_info, so the AVL rotations and
+the rebalancing walk keep it correct.
+
+    aggregate(lo, hi) combines the values of the keys in [lo, hi], in key
+    order (so combine need not be commutative). It descends to the node where
+    the paths to lo and hi split, and then along both paths, combining whole
+    subtrees hanging inside the range, in O(log(N)).
+
+    Time complexity:
+        Insert, delete, assignment: O(log(N))
+        aggregate: O(log(N))
+"""
+import math
+import operator
+
+try:
+    from .sorted_dict import MapNode, SortedDict
+except ImportError:
+    from sorted_dict import MapNode, SortedDict
+
+
+class Monoid(object):
+    """An associative combine function with its identity element. lift maps a
+        stored value to the element which is aggregated (the value itself if
+        lift is None).
+    """
+    def __init__(self,combine,identity,lift=None):
+        self.combine = combine
+        self.identity = identity
+        self.lift = lift
+
+
+SUM = Monoid(operator.add,0)
+MIN = Monoid(min,math.inf)
+MAX = Monoid(max,-math.inf)
+COUNT = Monoid(operator.add,0,lift=lambda value: 1)
+
+
+class AggregateNode(MapNode):
+    """A MapNode which stores the aggregate of its subtree's values. The
+        monoid is a class attribute, set by AggregateTree on a subclass.
+    """
+    __slots__ = ('aggregate',)
+    monoid = SUM
+
+    def __init__(self,key,value=None):
+        MapNode.__init__(self,key,value)
+        # key is None only for the temporary pseudo root used by BST.delete
+        self.aggregate = self.monoid.identity if key is None else self.lifted()
+
+    def lifted(self):
+        """Returns the monoid element of this node's own value"""
+        lift = self.monoid.lift
+        return self.value if lift is None else lift(self.value)
+
+    def update_subtree_info(self):
+        """Updates the height, size and the aggregate of the subtree"""
+        MapNode.update_subtree_info(self)
+        self.aggregate = self.updated_aggregate()
+
+    def updated_aggregate(self):
+        """Returns the aggregate of the subtree, left to right"""
+        combine = self.monoid.combine
+        aggregate = self.lifted()
+        if self.left is not None:
+            aggregate = combine(self.left.aggregate,aggregate)
+        if self.right is not None:
+            aggregate = combine(aggregate,self.right.aggregate)
+        return aggregate
+
+    def check_node_ri(self):
+        """Checks the aggregate of the node's subtree"""
+        if self.aggregate != self.updated_aggregate():
+            raise NameError('RI is violated by a wrong subtree aggregate')
+        return MapNode.check_node_ri(self)
+
+
+_node_classes = {}
+
+
+def node_class_for(node_class,monoid):
+    """Returns the subclass of node_class whose monoid class attribute is
+        monoid. It is created once per (node_class, monoid) pair and shared
+        by every tree using them.
+    """
+    key = (node_class,monoid)
+    if key not in _node_classes:
+        _node_classes[key] = type(node_class.__name__,(node_class,),
+                                  {'__slots__': (),'monoid': monoid})
+    return _node_classes[key]
+
+
+class AggregateTree(SortedDict):
+
+    def __init__(self,items=(),monoid=SUM,node_class=AggregateNode):
+        """Creates a sorted dict from (key, value) pairs which aggregates its
+            values with monoid (SUM, MIN, MAX, COUNT or any Monoid).
+        """
+        self.monoid = monoid
+        SortedDict.__init__(self,items,node_class=node_class_for(node_class,monoid))
+
+    def set_value(self,node,value):
+        """Replaces the value of node and refreshes the aggregates above it"""
+        node.value = value
+        while node is not None:
+            node.update_subtree_info()
+            node = node.parent
+
+    def aggregate(self,lo=None,hi=None):
+        """Returns the combination of the values of the keys k with
+            lo <= k <= hi (None for an unbounded end), in key order.
+        """
+        combine = self.monoid.combine
+        identity = self.monoid.identity
+        node = self.root
+        # find the node where the searches for lo and hi split
+        while node is not None:
+            if hi is not None and hi < node.key:
+                node = node.left
+            elif lo is not None and lo > node.key:
+                node = node.right
+            else:
+                break
+        if node is None:
+            return identity
+        # keys >= lo in the left subtree
+        left = identity
+        child = node.left
+        while child is not None:
+            if lo is None or not child.key < lo:
+                part = child.lifted()
+                if child.right is not None:
+                    part = combine(part,child.right.aggregate)
+                left = combine(part,left)
+                child = child.left
+            else:
+                child = child.right
+        # keys <= hi in the right subtree
+        right = identity
+        child = node.right
+        while child is not None:
+            if hi is None or not child.key > hi:
+                part = child.lifted()
+                if child.left is not None:
+                    part = combine(child.left.aggregate,part)
+                right = combine(right,part)
+                child = child.right
+            else:
+                child = child.left
+        return combine(combine(left,node.lifted()),right)
+
+
+# t = AggregateTree([(1,5),(3,2),(7,4),(9,1)])
+# print(t.aggregate(2,8), t.aggregate())
+# m = AggregateTree([(1,5),(3,2),(7,4)],monoid=MIN)
+# print(m.aggregate(2,None))
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+B+ tree
+
+A balanced search tree with wide nodes. Every node holds a sorted python
+list of up to `order` keys, searched with bisect, so a lookup visits only
+log_order(N) nodes instead of log_2(N) for a binary tree, and a key costs
+one list slot instead of a whole node object.
+
+    Leaves: hold all the keys, and are linked to their neighbours (next/prev)
+        so in-order and range scans run along the leaves.
+    Internal nodes: hold separators, keys[i] <= every key in children[i+1] and
+        keys[i] > every key in children[i].
+
+    Operations:
+        Insert: descends to the leaf, finds the position with
+            bisect.bisect_left (which also detects a duplicate key), inserts
+            there and, if the leaf overflows, splits it in two and adds a
+            separator to the parent (which may split in turn, up to the root).
+        Delete: removes the key from its leaf and, if the leaf underflows
+            (fewer than order//2 keys), borrows a key from a sibling or merges
+            with it (which may underflow the parent in turn, up to the root).
+
+    The surface is that of BST (insert, find, delete, min, successor,
+    iteration, iter_range), except that keys are returned rather than nodes.
+
+    Time complexity:
+        Search, insert, delete, min/max, successor: O(log(N))
+        Range scan of k keys: O(log(N) + k)
+"""
+from bisect import bisect_left, bisect_right
+
+
+class BTreeLeaf(object):
+    __slots__ = ('keys','next','prev')
+
+    def __init__(self,keys):
+        self.keys = keys
+        self.next = None
+        self.prev = None
+
+
+class BTreeInternal(object):
+    __slots__ = ('keys','children')
+
+    def __init__(self,keys,children):
+        self.keys = keys
+        self.children = children
+
+
+class BTree(object):
+
+    def __init__(self,order=64):
+        """Creates an empty B+ tree whose nodes hold at most order keys."""
+        if order < 3:
+            raise ValueError('The order must be at least 3')
+        self.order = order
+        self.min_keys = order//2
+        self.root = BTreeLeaf([])
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self,key):
+        return self.find(key) is not None
+
+    def find_leaf(self,key):
+        """Returns the leaf where key is or would be."""
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[bisect_right(node.keys,key)]
+        return node
+
+    def find(self,key):
+        """Returns key if it is in the tree, None otherwise."""
+        keys = self.find_leaf(key).keys
+        i = bisect_left(keys,key)
+        if i < len(keys) and keys[i] == key:
+            return keys[i]
+        return None
+
+    def min(self):
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[0]
+        return node.keys[0] if node.keys else None
+
+    def max(self):
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    def successor(self,key):
+        """Returns the smallest key larger than key, None if there is none."""
+        leaf = self.find_leaf(key)
+        i = bisect_right(leaf.keys,key)
+        while i == len(leaf.keys):
+            leaf = leaf.next
+            if leaf is None:
+                return None
+            i = 0
+        return leaf.keys[i]
+
+    def insert(self,key):
+        """Inserts key (nothing happens if it is already there)."""
+        path = []
+        node = self.root
+        while type(node) is BTreeInternal:
+            i = bisect_right(node.keys,key)
+            path.append((node,i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys,key)
+        if i < len(keys) and keys[i] == key:
+            return
+        keys.insert(i,key)
+        self.n += 1
+        if len(keys) > self.order:
+            self.split(node,path)
+
+    def split(self,node,path):
+        """Splits the overflowing node and the ancestors which overflow."""
+        while len(node.keys) > self.order:
+            mid = len(node.keys)//2
+            if type(node) is BTreeLeaf:
+                right = BTreeLeaf(node.keys[mid:])
+                del node.keys[mid:]
+                right.next = node.next
+                if right.next is not None:
+                    right.next.prev = right
+                right.prev = node
+                node.next = right
+                separator = right.keys[0]
+            else:
+                separator = node.keys[mid]
+                right = BTreeInternal(node.keys[mid+1:],node.children[mid+1:])
+                del node.keys[mid:]
+                del node.children[mid+1:]
+            if not path:
+                self.root = BTreeInternal([separator],[node,right])
+                return
+            node, i = path.pop()
+            node.keys.insert(i,separator)
+            node.children.insert(i+1,right)
+
+    def delete(self,key):
+        """Deletes key and returns it, or returns None if it is absent."""
+        path = []
+        node = self.root
+        while type(node) is BTreeInternal:
+            i = bisect_right(node.keys,key)
+            path.append((node,i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys,key)
+        if i == len(keys) or keys[i] != key:
+            return None
+        deleted = keys.pop(i)
+        self.n -= 1
+        self.fix_underflow(node,path)
+        return deleted
+
+    def fix_underflow(self,node,path):
+        """Refills the underflowing node (and its ancestors) by borrowing from
+            or merging with a sibling.
+        """
+        while path and len(node.keys) < self.min_keys:
+            parent, i = path.pop()
+            left = parent.children[i-1] if i > 0 else None
+            right = parent.children[i+1] if i + 1 < len(parent.children) else None
+            leaf = type(node) is BTreeLeaf
+            if left is not None and len(left.keys) > self.min_keys:
+                if leaf:
+                    node.keys.insert(0,left.keys.pop())
+                    parent.keys[i-1] = node.keys[0]
+                else:
+                    node.keys.insert(0,parent.keys[i-1])
+                    node.children.insert(0,left.children.pop())
+                    parent.keys[i-1] = left.keys.pop()
+                return
+            if right is not None and len(right.keys) > self.min_keys:
+                if leaf:
+                    node.keys.append(right.keys.pop(0))
+                    parent.keys[i] = right.keys[0]
+                else:
+                    node.keys.append(parent.keys[i])
+                    node.children.append(right.children.pop(0))
+                    parent.keys[i] = right.keys.pop(0)
+                return
+            # merge with a sibling, the right one into the left one
+            if right is None:
+                node, right, i = left, node, i - 1
+            if leaf:
+                node.keys.extend(right.keys)
+                node.next = right.next
+                if node.next is not None:
+                    node.next.prev = node
+            else:
+                node.keys.append(parent.keys[i])
+                node.keys.extend(right.keys)
+                node.children.extend(right.children)
+            del parent.keys[i]
+            del parent.children[i+1]
+            node = parent
+        if type(self.root) is BTreeInternal and not self.root.keys:
+            self.root = self.root.children[0]
+
+    def __iter__(self):
+        """Yields the keys in ascending order, along the leaves."""
+        return self.iter_range()
+
+    def __reversed__(self):
+        """Yields the keys in descending order, along the leaves."""
+        node = self.root
+        while type(node) is BTreeInternal:
+            node = node.children[-1]
+        while node is not None:
+            yield from reversed(node.keys)
+            node = node.prev
+
+    def iter_range(self,lo=None,hi=None,inclusive=True):
+        """Lazily yields the keys k with lo <= k <= hi in ascending order.
+            As in BST.iter_range, None is an unbounded end and inclusive is a
+            bool or a (lo, hi) pair of bools.
+        """
+        if inclusive is True or inclusive is False:
+            inclusive = (inclusive,inclusive)
+        if lo is None:
+            leaf = self.root
+            while type(leaf) is BTreeInternal:
+                leaf = leaf.children[0]
+            i = 0
+        else:
+            leaf = self.find_leaf(lo)
+            i = (bisect_left if inclusive[0] else bisect_right)(leaf.keys,lo)
+        while leaf is not None:
+            keys = leaf.keys
+            if hi is not None and keys and not keys[-1] < hi:
+                end = (bisect_right if inclusive[1] else bisect_left)(keys,hi)
+                yield from keys[i:end]
+                return
+            yield from keys[i:]
+            leaf = leaf.next
+            i = 0
+
+    def to_sorted_list(self):
+        """Returns a list of the keys in ascending order in O(N)."""
+        return list(self)
+
+    def check_ri(self):
+        """Checks the key order, the node sizes, the depth of the leaves and
+            the leaf links.
+        """
+        leaves = []
+        stack = [(self.root,None,None,0)]
+        depths = set()
+        while stack:
+            node, lo, hi, depth = stack.pop()
+            keys = node.keys
+            if node is not self.root and len(keys) < self.min_keys:
+                raise NameError('RI is violated by an underfull node')
+            if len(keys) > self.order:
+                raise NameError('RI is violated by an overfull node')
+            if any(not keys[j] < keys[j+1] for j in range(len(keys) - 1)):
+                raise NameError('RI is violated by unsorted keys')
+            if keys and ((lo is not None and keys[0] < lo) or
+                         (hi is not None and not keys[-1] < hi)):
+                raise NameError('RI is violated by a key outside its range')
+            if type(node) is BTreeLeaf:
+                leaves.append(node)
+                depths.add(depth)
+                continue
+            if len(node.children) != len(keys) + 1:
+                raise NameError('RI is violated by the number of children')
+            bounds = [lo] + keys + [hi]
+            for j in range(len(node.children) - 1,-1,-1):
+                stack.append((node.children[j],bounds[j],bounds[j+1],depth + 1))
+        if len(depths) > 1:
+            raise NameError('RI is violated by leaves at different depths')
+        for a, b in zip(leaves,leaves[1:]):
+            if a.next is not b or b.prev is not a:
+                raise NameError('RI is violated by the leaf links')
+        if sum(len(leaf.keys) for leaf in leaves) != self.n:
+            raise NameError('RI is violated by the key count')
+        return True
+
+
+# tree = BTree(order=4)
+# for key in [10,11,18,6,2,7,15,3,1]:
+#     tree.insert(key)
+# tree.delete(10)
+# print(list(tree), list(tree.iter_range(3,15)), tree.successor(11), tree.check_ri())
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks
+
+Micro-benchmarks for the tree based data structures. Run from this directory:
+
+    python3 benchmarks.py            runs every benchmark
+    python3 benchmarks.py heap       runs only the named benchmark(s)
+
+Each benchmark prints one line per configuration. Timings use
+time.perf_counter and report the mean cost of a single operation.
+"""
+import itertools
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from AVL_tree import AVL
+from BST import BST
+from b_tree import BTree
+from binary_heap import Heap
+from d_ary_heap import DaryHeap
+from pairing_heap import PairingHeap
+from red_black_tree import RedBlackTree
+from splay_tree import SplayTree
+
+
+def timed(f, *args):
+    """Returns the wall clock time (in seconds) of calling f(*args)."""
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+
+def zipf_keys(n, s=1.1, universe=10**5):
+    """n keys drawn from range(universe) with P(k) proportional to 1/(k+1)**s.
+        The ranks are shuffled so that hot keys are spread over the key space.
+    """
+    cum_weights = list(itertools.accumulate(1/(k + 1)**s for k in range(universe)))
+    labels = list(range(universe))
+    random.shuffle(labels)
+    return [labels[k] for k in random.choices(range(universe), cum_weights=cum_weights, k=n)]
+
+
+def key_streams(n):
+    """The random, sorted and Zipfian key streams used by the tree benchmarks."""
+    return {
+        'random': random.sample(range(10*n), n),
+        'sorted': list(range(n)),
+        'zipf': zipf_keys(n),
+    }
+
+
+def bench_heap(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), ops=10**4):
+    """Per-operation cost of Heap.insert and Heap.extract_max as the heap grows.
+        If both are O(log(n)) the cost divided by log2(n) stays roughly flat.
+    """
+    print('heap: n, insert ns/op, extract_max ns/op, (ns/op)/log2(n) for both')
+    for n in sizes:
+        h = Heap([random.random() for _ in range(n)])
+        items = [random.random() for _ in range(ops)]
+
+        def push():
+            for item in items:
+                h.insert(item)
+
+        def pop():
+            for _ in range(ops):
+                h.extract_max()
+
+        t_push = timed(push)*1e9/ops
+        t_pop = timed(pop)*1e9/ops
+        log_n = math.log2(n)
+        print(f'{n:>10} {t_push:10.0f} {t_pop:10.0f} '
+              f'{t_push/log_n:8.1f} {t_pop/log_n:8.1f}')
+
+
+def bench_dary_heap(sizes=(10**5, 10**6, 10**7), arities=(2, 4, 8), ops=10**4):
+    """Insert and extract_max throughput of DaryHeap for several arities."""
+    print('d-ary heap: n, d, inserts/s, extract_max/s')
+    for n in sizes:
+        base = [random.random() for _ in range(n)]
+        items = [random.random() for _ in range(ops)]
+        for d in arities:
+            h = DaryHeap(list(base),d)
+
+            def push():
+                for item in items:
+                    h.insert(item)
+
+            def pop():
+                for _ in range(ops):
+                    h.extract_max()
+
+            print(f'{n:>10} {d:>3} {ops/timed(push):12.0f} {ops/timed(pop):12.0f}')
+
+
+def bench_pairing_heap(n=10**5, inserts_per_extract=10, shards=1000, shard_size=100):
+    """PairingHeap against Heap on an insert-heavy trace (inserts_per_extract
+        inserts for every extract_max) and on a meld-heavy trace (shards heaps
+        of shard_size items melded one by one into a single heap).
+    """
+    print('pairing heap vs binary heap: trace, Heap s, PairingHeap s')
+    keys = [random.random() for _ in range(n)]
+
+    def insert_heavy(h):
+        for i, key in enumerate(keys):
+            h.insert(key)
+            if i % inserts_per_extract == 0:
+                h.extract_max()
+
+    t_binary = timed(insert_heavy, Heap([]))
+    t_pairing = timed(insert_heavy, PairingHeap())
+    print(f'{"insert-heavy":>14} {t_binary:8.3f} {t_pairing:8.3f}')
+
+    parts = [[random.random() for _ in range(shard_size)] for _ in range(shards)]
+    binary = [Heap(list(part)) for part in parts]
+    pairing = [PairingHeap(part) for part in parts]
+
+    def meld_binary():
+        h = Heap([])
+        for other in binary:
+            h.merge(other)
+
+    def meld_pairing():
+        h = PairingHeap()
+        for other in pairing:
+            h.meld(other)
+
+    print(f'{"meld-heavy":>14} {timed(meld_binary):8.3f} {timed(meld_pairing):8.3f}')
+
+
+def bench_bst(n=10**4, trees=(BST, AVL)):
+    """Insert and find throughput of BST and AVL on random, sorted and Zipfian
+        key streams. Sorted keys degenerate the plain BST into a linked list.
+    """
+    print('bst: tree, stream, inserts/s, finds/s, height')
+    for name, keys in key_streams(n).items():
+        for tree_class in trees:
+            tree = tree_class()
+
+            def insert():
+                for key in keys:
+                    tree.insert(key)
+
+            def find():
+                for key in keys:
+                    tree.find(key)
+
+            t_insert = timed(insert)
+            t_find = timed(find)
+            height, level = 0, [tree.root]
+            while level:
+                level = [child for node in level for child in (node.left, node.right)
+                         if child is not None]
+                height += 1
+            print(f'{tree_class.__name__:>6} {name:>7} {n/t_insert:10.0f} '
+                  f'{n/t_find:10.0f} {height - 1:6}')
+
+
+def bench_memory(n=10**6, trees=(BST, AVL)):
+    """Bytes per key of the nodes of BST and AVL holding n random keys,
+        measured with tracemalloc (the keys themselves are allocated first and
+        are not counted).
+    """
+    print('memory: tree, keys, bytes/key')
+    keys = random.sample(range(10*n), n)
+    sorted_keys = sorted(keys)
+    for tree_class in trees:
+        tracemalloc.start()
+        if hasattr(tree_class, 'from_sorted'):
+            tree = tree_class.from_sorted(sorted_keys)
+        else:
+            tree = tree_class()
+            for key in keys:
+                tree.insert(key)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f'{tree_class.__name__:>6} {n:>10} {allocated/n:8.1f}')
+        del tree
+
+
+def mixed_trace(n, universe, mix):
+    """n (operation, key) pairs, where mix maps 'insert'/'delete'/'find' to
+        their relative frequencies.
+    """
+    operations = random.choices(list(mix), weights=list(mix.values()), k=n)
+    return [(operation, random.randrange(universe)) for operation in operations]
+
+
+def run_trace(tree, trace):
+    for operation, key in trace:
+        if operation == 'insert':
+            tree.insert(key)
+        elif operation == 'delete':
+            tree.delete(key)
+        else:
+            tree.find(key)
+
+
+def bench_red_black(n=2*10**5, universe=10**5, trees=(AVL, RedBlackTree)):
+    """Mixed insert/delete/find traces on AVL and RedBlackTree, from
+        write-heavy to read-heavy.
+    """
+    print('red-black vs AVL: insert/delete/find mix, ' +
+          ', '.join(f'{tree_class.__name__} ops/s' for tree_class in trees))
+    mixes = [(45, 45, 10), (25, 25, 50), (5, 5, 90)]
+    for mix in mixes:
+        trace = mixed_trace(n, universe, dict(zip(('insert', 'delete', 'find'), mix)))
+        rates = [n/timed(run_trace, tree_class(), trace) for tree_class in trees]
+        print(f'{"/".join(map(str, mix)):>10} ' + ' '.join(f'{rate:12.0f}' for rate in rates))
+
+
+def bench_b_tree(n=10**6, lookups=10**5, scans=100, scan_length=10**4, orders=(16, 64, 256)):
+    """BTree (for several orders) against AVL: find latency, range scan
+        throughput and bytes per key, on n random keys.
+    """
+    print('b-tree vs AVL: tree, find ns/op, scanned keys/s, bytes/key')
+    keys = random.sample(range(10*n), n)
+    sorted_keys = sorted(keys)
+    probes = random.choices(keys, k=lookups)
+    starts = random.choices(sorted_keys[:-scan_length], k=scans)
+    builders = [('AVL', lambda: AVL.from_sorted(sorted_keys))]
+    for order in orders:
+        def build(order=order):
+            tree = BTree(order)
+            for key in keys:
+                tree.insert(key)
+            return tree
+        builders.append((f'BTree({order})', build))
+    for name, build in builders:
+        tracemalloc.start()
+        tree = build()
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        def find():
+            for key in probes:
+                tree.find(key)
+
+        def scan():
+            for start in starts:
+                for _ in itertools.islice(tree.iter_range(start), scan_length):
+                    pass
+
+        t_find = timed(find)*1e9/lookups
+        scanned = scans*scan_length/timed(scan)
+        print(f'{name:>12} {t_find:10.0f} {scanned:12.0f} {allocated/n:8.1f}')
+        del tree
+
+
+def bench_batch(n=10**5, batch_sizes=(10, 10**2, 10**3, 10**4, 10**5)):
+    """AVL insert_many/delete_many/find_many against a loop of single
+        operations, for batches of random keys into a tree of n keys.
+    """
+    print('AVL batches: batch size, op, loop ns/key, batch ns/key')
+    keys = random.sample(range(0, 20*n, 2), n)
+    base = sorted(keys)
+    for m in batch_sizes:
+        batch = sorted(random.sample(range(1, 20*n, 2), m))
+        probes = sorted(random.sample(keys, m))
+        for op, loop, many, batch_keys in (
+                ('insert', AVL.insert, AVL.insert_many, batch),
+                ('delete', AVL.delete, AVL.delete_many, probes),
+                ('find', AVL.find, AVL.find_many, probes)):
+            tree = AVL.from_sorted(base)
+            t_loop = timed(lambda: [loop(tree, key) for key in batch_keys])
+            tree = AVL.from_sorted(base)
+            t_many = timed(many, tree, batch_keys)
+            print(f'{m:>8} {op:>6} {t_loop*1e9/m:10.0f} {t_many*1e9/m:10.0f}')
+
+
+def bench_splay(n=2*10**5, universe=10**5, trees=(AVL, SplayTree)):
+    """AVL against SplayTree on finds and on a 5/5/90 insert/delete/find mix,
+        with uniform keys and with Zipf(1.1) keys.
+    """
+    print('splay vs AVL: keys, trace, ' +
+          ', '.join(f'{tree_class.__name__} ops/s' for tree_class in trees))
+    initial = random.sample(range(universe), universe)
+    streams = {'uniform': [random.randrange(universe) for _ in range(n)],
+               'zipf': zipf_keys(n, universe=universe)}
+    for name, keys in streams.items():
+        mix = random.choices(('insert', 'delete', 'find'), weights=(5, 5, 90), k=n)
+        traces = {'find': [('find', key) for key in keys],
+                  'mixed': list(zip(mix, keys))}
+        for trace_name, trace in traces.items():
+            rates = []
+            for tree_class in trees:
+                tree = tree_class()
+                for key in initial:
+                    tree.insert(key)
+                rates.append(n/timed(run_trace, tree, trace))
+            print(f'{name:>8} {trace_name:>6} ' + ' '.join(f'{rate:12.0f}' for rate in rates))
+
+
+BENCHMARKS = {
+    'heap': bench_heap,
+    'dary_heap': bench_dary_heap,
+    'pairing_heap': bench_pairing_heap,
+    'bst': bench_bst,
+    'memory': bench_memory,
+    'red_black': bench_red_black,
+    'b_tree': bench_b_tree,
+    'batch': bench_batch,
+    'splay': bench_splay,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
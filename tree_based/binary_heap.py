@@ -20,47 +20,90 @@ A heap DS is a complete binary tree that satisfies the heap property:
             7. Repat 3-7 until the subtrees are also heapified.
             
         Delete: Recieves and index of the deleted item, swaps it with the last
-                leaf and max-heapifies the list.
+                leaf and sifts the moved leaf up or down until the heap
+                property is restored.
         
-        Insert: Inserts and item and returns a heapified list. Inserts the item
-                in the last leaf and heapifies the tree.
+        Insert: Inserts the item in the last leaf and sifts it up, swapping
+                it with its parent (at (i-1)//2) while it is larger.
             
-        Peek/Find min/max: 
+        Peek/Find min/max: Returns the root.
     Time complexity:
         Heapify:  Builds the heap in O(n)
-        Insert: 
-        Delete:
+        Insert: O(log(n))
+        Delete: O(log(n))
+        Peek: O(1)
+            
+    AddressableHeap: push returns a handle which tracks the item's position in
+        the list, so update_priority (increase/decrease key) and remove take
+        O(log(n)) without searching for the item.
+        
+    Batches: push_many picks between k sift-ups and one O(n+k) re-heapify,
+        pushpop/replace combine an insert and an extract in a single sift and
+        top_k streams any iterable keeping only k items in memory.
+        
+    LazyHeap: cancel(item) leaves a tombstone in O(1) which is skipped when it
+        reaches the root; the list is compacted once too many items are dead.
+            
+    heapsort sorts a list in place and kway_merge lazily merges sorted
+        iterables, holding one item per input.
             
     Good for: 
         1. Heap sort
         2. Dijstra's algorithm
         3. Priority queue
 """
+import itertools
+import math
+
+try:
+    from . import snapshot
+except ImportError:
+    import snapshot
+
 
 class Heap(object):
     
     def __init__(self,L):
-        '''L is a python list'''
+        '''L is a python list, it is max-heapified in place in O(n).'''
         self.L = L
         self.n = len(L)
+        self.max_heapify_list()
     
     def __str__(self):
         return str(self.L)
         
     def max_heapify(self,n,i):
-        left = 2*i + 1     # left child index
-        right = 2*i + 2     # right  child indes
-        largest = i
-        
-        if left < self.n and self.L[left] > self.L[largest]:
+        """Sifts L[i] down the subtree rooted at i, considering only the first
+            n items of the list. Iterative, so deep heaps never hit the
+            recursion limit.
+        """
+        L = self.L
+        item = L[i]
+        while True:
+            left = 2*i + 1     # left child index
+            if left >= n:
+                break
+            right = left + 1     # right  child index
             largest = left
-            
-        if right < self.n and self.L[right] > self.L[largest]:
-            largest = right
-        
-        if largest != i:
-            self.L[largest], self.L[i] = self.L[i], self.L[largest]
-            self.max_heapify(n,largest)
+            if right < n and L[right] > L[left]:
+                largest = right
+            if not L[largest] > item:
+                break
+            L[i] = L[largest]
+            i = largest
+        L[i] = item
+
+    def sift_up(self,i):
+        """Moves L[i] up towards the root while it is larger than its parent."""
+        L = self.L
+        item = L[i]
+        while i > 0:
+            parent = (i - 1)//2
+            if not item > L[parent]:
+                break
+            L[i] = L[parent]
+            i = parent
+        L[i] = item
 
     def max_heapify_list(self):
         '''Max heapifies the entire list'''        
@@ -69,13 +112,17 @@ class Heap(object):
             
     def delete_node(self,index):
         '''Deletes the element L[index]. Algorithm swaps L[index] with the last
-            leaf and heapifies the list. 
+            leaf, removes it and sifts the moved leaf up or down.
         '''
         if index < self.n:
-            self.L[index], self.L[self.n-1] = self.L[self.n-1], self.L[index]
-            self.L.pop()
+            last = self.L.pop()
             self.n -= 1
-            self.max_heapify_list()
+            if index < self.n:
+                self.L[index] = last
+                # At most one of the two sifts moves anything: if last rises,
+                # the parent that takes its place dominates the subtree.
+                self.sift_up(index)
+                self.max_heapify(self.n,index)
         else:
             print('Index out of range')
             
@@ -95,14 +142,545 @@ class Heap(object):
         return temp
     
     def insert(self,item):
-        '''Inserts the item in the last leaf and heapifies the tree.'''
+        '''Inserts the item in the last leaf and sifts it up.'''
         self.L.append(item)
         self.n += 1
+        self.sift_up(self.n - 1)
+        
+    def push_many(self,items):
+        '''Inserts every item of the iterable. Small batches are sifted up one
+            at a time (O(k*log(n+k))), large ones are appended and the whole
+            list is re-heapified bottom-up (O(n+k)), whichever is cheaper.
+        '''
+        items = list(items)
+        k = len(items)
+        if k == 0:
+            return
+        if k*math.log2(self.n + k) > self.n + k:
+            self.L.extend(items)
+            self.n += k
+            self.max_heapify_list()
+        else:
+            for item in items:
+                self.L.append(item)
+                self.n += 1
+                self.sift_up(self.n - 1)
+                
+    def pushpop(self,item):
+        '''Inserts item and then extracts the maximum, with a single sift.'''
+        if self.n and self.L[0] > item:
+            item, self.L[0] = self.L[0], item
+            self.max_heapify(self.n,0)
+        return item
+    
+    def replace(self,item):
+        '''Extracts the maximum and then inserts item, with a single sift.
+            Unlike pushpop the returned item is never item itself.
+        '''
+        if self.n == 0:
+            raise IndexError('replace on an empty heap')
+        top = self.L[0]
+        self.L[0] = item
+        self.max_heapify(self.n,0)
+        return top
+    
+    def merge(self,other):
+        '''Inserts all the items of the heap other (which is left unchanged).'''
+        self.push_many(other.L)
+        
+    def save(self,path):
+        '''Saves the list, in heap order, to a binary snapshot file.'''
+        snapshot.save(path,self.L,snapshot.HEAP,arity=2)
+        
+    @classmethod
+    def load(cls,path,**kwargs):
+        '''Builds a heap from a snapshot file, kwargs go to the constructor.
+            The list is already in heap order, so the O(n) heapify only
+            checks it. Only load trusted files: snapshots of non-numeric
+            items are pickles.
+        '''
+        return cls(snapshot.load(path,snapshot.HEAP),**kwargs)
+        
+        
+        
+            
+class HeapHandle(object):
+    """A stable reference to an item stored in an AddressableHeap."""
+    def __init__(self,priority,item,index):
+        """ Creates a handle.
+        
+            Args:
+                priority: the key the heap is ordered by
+                item: the payload stored alongside the priority
+                index: int, the current position of the handle in the heap's
+                    list, kept up to date by the heap (-1 once removed).
+        """
+        self.priority = priority
+        self.item = item
+        self.index = index
+        
+    def __gt__(self,other):
+        return self.priority > other.priority
+    
+    def __repr__(self):
+        return f'({self.priority!r}, {self.item!r})'
+
+
+class AddressableHeap(Heap):
+    """A max heap whose push returns a HeapHandle. Every handle records its
+        position in the list, which is updated whenever the handle moves, so
+        an item can be re-prioritized or removed in O(log(n)) without a scan.
+    """
+    
+    def __init__(self):
+        Heap.__init__(self,[])
+        
+    def __len__(self):
+        return self.n
+    
+    def __contains__(self,handle):
+        return 0 <= handle.index < self.n and self.L[handle.index] is handle
+        
+    def max_heapify(self,n,i):
+        """Sifts L[i] down, updating the index of every moved handle."""
+        L = self.L
+        handle = L[i]
+        priority = handle.priority
+        while True:
+            left = 2*i + 1
+            if left >= n:
+                break
+            right = left + 1
+            largest = left
+            if right < n and L[right].priority > L[left].priority:
+                largest = right
+            child = L[largest]
+            if not child.priority > priority:
+                break
+            L[i] = child
+            child.index = i
+            i = largest
+        L[i] = handle
+        handle.index = i
+    
+    def sift_up(self,i):
+        """Sifts L[i] up, updating the index of every moved handle."""
+        L = self.L
+        handle = L[i]
+        priority = handle.priority
+        while i > 0:
+            parent_index = (i - 1)//2
+            parent = L[parent_index]
+            if not priority > parent.priority:
+                break
+            L[i] = parent
+            parent.index = i
+            i = parent_index
+        L[i] = handle
+        handle.index = i
+        
+    def delete_node(self,index):
+        """Deletes the handle at L[index] and invalidates it."""
+        if index < self.n:
+            handle = self.L[index]
+            Heap.delete_node(self,index)
+            handle.index = -1
+        else:
+            print('Index out of range')
+    
+    def push(self,item,priority=None):
+        """Inserts item with the given priority (the item itself if priority
+            is None) and returns its handle.
+        """
+        if priority is None:
+            priority = item
+        handle = HeapHandle(priority,item,self.n)
+        self.L.append(handle)
+        self.n += 1
+        self.sift_up(self.n - 1)
+        return handle
+    
+    def insert(self,item):
+        """Inserts an item which is its own priority."""
+        self.push(item)
+        
+    def push_many(self,items):
+        """Inserts every item (each is its own priority) and returns the list
+            of their handles.
+        """
+        return self._push_handles([HeapHandle(item,item,-1) for item in items])
+    
+    def merge(self,other):
+        """Inserts the items of the AddressableHeap other, with their
+            priorities, and returns the new handles. other is left unchanged.
+        """
+        return self._push_handles([HeapHandle(handle.priority,handle.item,-1)
+                                   for handle in other.L])
+    
+    def save(self,path):
+        """Saves the (priority, item) pairs, in heap order, to a binary
+            snapshot file.
+        """
+        snapshot.save(path,[(handle.priority,handle.item) for handle in self.L],
+                      snapshot.HEAP_ITEMS)
+        
+    @classmethod
+    def load(cls,path):
+        """Builds a heap from a snapshot file written by AddressableHeap.save.
+            The items get new handles, in the heap's list L.
+        """
+        heap = cls()
+        heap._push_handles([HeapHandle(priority,item,-1) for priority, item
+                            in snapshot.load(path,snapshot.HEAP_ITEMS)])
+        return heap
+    
+    def _push_handles(self,handles):
+        """Appends the handles and restores the heap property, choosing between
+            sifting up and a bottom-up re-heapify as in Heap.push_many.
+        """
+        k = len(handles)
+        if k == 0:
+            return handles
+        bulk = k*math.log2(self.n + k) > self.n + k
+        for handle in handles:
+            handle.index = self.n
+            self.L.append(handle)
+            self.n += 1
+            if not bulk:
+                self.sift_up(handle.index)
+        if bulk:
+            self.max_heapify_list()
+        return handles
+    
+    def pushpop(self,item,priority=None):
+        """Inserts item and then extracts and returns the item with the maximal
+            priority, with a single sift, as Heap.pushpop.
+        """
+        return self.pushpop_handle(item,priority)[0]
+    
+    def replace(self,item,priority=None):
+        """Extracts and returns the item with the maximal priority and then
+            inserts item, with a single sift, as Heap.replace.
+        """
+        return self.replace_handle(item,priority)[0]
+    
+    def pushpop_handle(self,item,priority=None):
+        """As pushpop, but returns the extracted item together with the handle
+            of the inserted one (already removed, with index -1, if it was the
+            one extracted).
+        """
+        if priority is None:
+            priority = item
+        handle = HeapHandle(priority,item,-1)
+        if self.n and self.L[0].priority > priority:
+            return self._replace_root(handle), handle
+        return item, handle
+    
+    def replace_handle(self,item,priority=None):
+        """As replace, but returns the extracted item together with the handle
+            of the inserted one.
+        """
+        if self.n == 0:
+            raise IndexError('replace on an empty heap')
+        if priority is None:
+            priority = item
+        handle = HeapHandle(priority,item,-1)
+        return self._replace_root(handle), handle
+    
+    def _replace_root(self,handle):
+        """Puts handle at the root, sifts it down and returns the item of the
+            handle it replaced (which is invalidated).
+        """
+        top = self.L[0]
+        top.index = -1
+        self.L[0] = handle
+        self.max_heapify(self.n,0)
+        return top.item
+        
+    def peek(self):
+        """Returns the item with the maximal priority."""
+        return self.L[0].item
+    
+    def extract_max(self):
+        """Removes and returns the item with the maximal priority."""
+        handle = self.L[0]
+        self.delete_node(0)
+        return handle.item
+    
+    def update_priority(self,handle,priority):
+        """Sets the priority of handle and moves it up or down accordingly."""
+        if handle not in self:
+            raise KeyError('The handle is not in the heap')
+        old_priority = handle.priority
+        handle.priority = priority
+        if priority > old_priority:
+            self.sift_up(handle.index)
+        else:
+            self.max_heapify(self.n,handle.index)
+            
+    def increase_key(self,handle,priority):
+        """Raises the priority of handle, moving it towards the root."""
+        if priority < handle.priority:
+            raise ValueError('The new priority is smaller than the current one')
+        self.update_priority(handle,priority)
+        
+    def decrease_key(self,handle,priority):
+        """Lowers the priority of handle, moving it towards the leaves."""
+        if priority > handle.priority:
+            raise ValueError('The new priority is larger than the current one')
+        self.update_priority(handle,priority)
+    
+    def remove(self,handle):
+        """Removes handle from the heap and returns its item."""
+        if handle not in self:
+            raise KeyError('The handle is not in the heap')
+        self.delete_node(handle.index)
+        return handle.item
+        
+        
+class LazyHeap(Heap):
+    """A max heap with lazy deletion.
+    
+        cancel(item) only records a tombstone for one copy of item, in O(1).
+        Dead copies stay in the list until they reach the root, where peek and
+        extract_max discard them. Once dead copies exceed max_dead_fraction of
+        the list, compact rebuilds it without them in O(n).
+        Items must be hashable; equal items are interchangeable.
+    """
+    
+    def __init__(self,L,max_dead_fraction=0.5):
+        '''L is a python list, it is max-heapified in place in O(n).'''
+        Heap.__init__(self,L)
+        self.max_dead_fraction = max_dead_fraction
+        self.live = {}      # item -> number of live copies
+        self.dead = {}      # item -> number of tombstoned copies
+        self.dead_count = 0
+        self._add_live(L)
+            
+    def __len__(self):
+        return self.n - self.dead_count
+    
+    @property
+    def live_count(self):
+        """The number of items in the heap which were not cancelled."""
+        return self.n - self.dead_count
+    
+    def _add_live(self,items):
+        live = self.live
+        for item in items:
+            live[item] = live.get(item,0) + 1
+            
+    def _remove_live(self,item):
+        count = self.live[item] - 1
+        if count:
+            self.live[item] = count
+        else:
+            del self.live[item]
+            
+    def _remove_dead(self,item):
+        count = self.dead[item] - 1
+        if count:
+            self.dead[item] = count
+        else:
+            del self.dead[item]
+        self.dead_count -= 1
+    
+    def _discard_dead_root(self):
+        """Pops tombstoned items off the root."""
+        while self.n and self.L[0] in self.dead:
+            item = self.L[0]
+            Heap.delete_node(self,0)
+            self._remove_dead(item)
+    
+    def cancel(self,item):
+        """Marks one copy of item as deleted in O(1) (amortized, including
+            the compactions it triggers).
+        """
+        if item not in self.live:
+            raise KeyError(item)
+        self._remove_live(item)
+        self.dead[item] = self.dead.get(item,0) + 1
+        self.dead_count += 1
+        if self.dead_count > self.max_dead_fraction*self.n:
+            self.compact()
+            
+    def compact(self):
+        """Removes every tombstoned item and re-heapifies the list in O(n)."""
+        dead = self.dead
+        kept = []
+        for item in self.L:
+            count = dead.get(item)
+            if count:
+                dead[item] = count - 1
+            else:
+                kept.append(item)
+        self.L[:] = kept
+        self.n = len(kept)
+        self.dead = {}
+        self.dead_count = 0
         self.max_heapify_list()
         
+    def delete_node(self,index):
+        '''Deletes L[index] immediately (it may be a dead copy).'''
+        if index < self.n:
+            item = self.L[index]
+            Heap.delete_node(self,index)
+            if item in self.dead:
+                self._remove_dead(item)
+            else:
+                self._remove_live(item)
+        else:
+            print('Index out of range')
+            
+    def peek(self):
+        '''Returns the largest live item.'''
+        self._discard_dead_root()
+        return self.L[0]
+    
+    def extract_max(self):
+        '''Removes and returns the largest live item.'''
+        self._discard_dead_root()
+        return Heap.extract_max(self)
+    
+    def insert(self,item):
+        Heap.insert(self,item)
+        self.live[item] = self.live.get(item,0) + 1
         
+    def push_many(self,items):
+        items = list(items)
+        self._add_live(items)
+        Heap.push_many(self,items)
+            
+    def merge(self,other):
+        """Inserts the live items of the heap other (which is left unchanged).
+            If other is a LazyHeap its tombstoned copies are skipped.
+        """
+        if isinstance(other,LazyHeap):
+            self.push_many(other.live_items())
+        else:
+            self.push_many(other.L)
+            
+    def live_items(self):
+        """Returns a list of the items which were not cancelled, skipping the
+            tombstoned copies as compact does.
+        """
+        dead = dict(self.dead)
+        items = []
+        for item in self.L:
+            count = dead.get(item)
+            if count:
+                dead[item] = count - 1
+            else:
+                items.append(item)
+        return items
         
+    def save(self,path):
+        """Saves the live items to a binary snapshot file (the cancelled ones
+            are left out).
+        """
+        snapshot.save(path,self.live_items(),snapshot.HEAP,arity=2)
             
+    def pushpop(self,item):
+        self._discard_dead_root()
+        result = Heap.pushpop(self,item)
+        if result is not item:
+            self.live[item] = self.live.get(item,0) + 1
+            self._remove_live(result)
+        return result
+    
+    def replace(self,item):
+        self._discard_dead_root()
+        result = Heap.replace(self,item)
+        self.live[item] = self.live.get(item,0) + 1
+        self._remove_live(result)
+        return result
+    
+    
+class _Reversed(object):
+    """Wraps an item so that a max heap of wrappers orders the items as a min
+        heap.
+    """
+    def __init__(self,item):
+        self.item = item
+        
+    def __gt__(self,other):
+        return other.item > self.item
+    
+    
+def top_k(iterable,k):
+    """Returns the k largest items of iterable, largest first. The input is
+        streamed through a heap of the k best items seen so far, whose root is
+        the smallest of them, so memory is O(k) however long the input is.
+    """
+    if k <= 0:
+        return []
+    iterable = iter(iterable)
+    h = Heap([_Reversed(item) for item in itertools.islice(iterable,k)])
+    for item in iterable:
+        if item > h.L[0].item:
+            h.replace(_Reversed(item))
+    result = [wrapper.item for wrapper in h.L]
+    result.sort(reverse=True)
+    return result
+
+
+def heapsort(L):
+    """Sorts the list L in place in ascending order in O(n*log(n)).
+        L is max-heapified, then the root is repeatedly swapped with the last
+        item of the shrinking heap and sifted down. No other list is created.
+    """
+    h = Heap(L)
+    for end in range(h.n - 1,0,-1):
+        L[0], L[end] = L[end], L[0]
+        h.max_heapify(end,0)
+    return L
+
+
+class _MergeEntry(object):
+    """The current head of one of the streams merged by kway_merge. The max
+        heap of entries orders them smallest key first, ties broken by the
+        stream index so the merge is stable.
+    """
+    def __init__(self,key,order,value,iterator):
+        self.key = key
+        self.order = order
+        self.value = value
+        self.iterator = iterator
+        
+    def __gt__(self,other):
+        return other.key > self.key or (not self.key > other.key
+                                         and other.order > self.order)
+    
+    
+def kway_merge(*iterables,key=None):
+    """Lazily merges sorted iterables into one sorted stream. Only the head of
+        every input is held in memory, so memory is O(k) for k inputs and
+        every item costs O(log(k)).
+    """
+    entries = []
+    for order, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for value in iterator:
+            entries.append(_MergeEntry(value if key is None else key(value),
+                                       order,value,iterator))
+            break
+    h = Heap(entries)
+    while h.n > 1:
+        entry = h.L[0]
+        yield entry.value
+        for value in entry.iterator:
+            entry.value = value
+            entry.key = value if key is None else key(value)
+            h.max_heapify(h.n,0)
+            break
+        else:
+            h.extract_max()
+    if h.n:
+        entry = h.L[0]
+        yield entry.value
+        yield from entry.iterator
+    
+    
 # Max heapify the list L        
 # L = [7,7,12,2,8,9,10]
 # h = Heap(L)
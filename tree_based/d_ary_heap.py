@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+D-ary heap
+
+A generalization of the binary heap in which every node has d children.
+The children of index i are d*i+1, ..., d*i+d and its parent is (i-1)//d.
+
+    A larger d gives a shallower tree, log_d(n) levels instead of log_2(n):
+        Insert (sift up) compares once per level, so it gets faster with d.
+        Delete/extract max (sift down) compares d children per level, so it
+        does more comparisons but touches fewer levels, and the d children
+        are adjacent in the list.
+    
+    Time complexity:
+        Heapify: O(n)
+        Insert: O(log_d(n))
+        Delete: O(d*log_d(n))
+        Peek: O(1)
+        
+    The API is identical to binary_heap.Heap, which is the case d = 2.
+"""
+try:
+    from .binary_heap import Heap
+    from . import snapshot
+except ImportError:
+    from binary_heap import Heap
+    import snapshot
+
+
+class DaryHeap(Heap):
+    
+    def __init__(self,L,d=4):
+        '''L is a python list, it is max-heapified in place in O(n).
+            d is the number of children of every node (d >= 2).
+        '''
+        if d < 2:
+            raise ValueError('The arity d must be at least 2')
+        self.d = d
+        Heap.__init__(self,L)
+        
+    def max_heapify(self,n,i):
+        """Sifts L[i] down the subtree rooted at i, considering only the first
+            n items of the list.
+        """
+        L = self.L
+        d = self.d
+        item = L[i]
+        while True:
+            first = d*i + 1     # first child index
+            if first >= n:
+                break
+            largest = first
+            for child in range(first + 1, min(first + d, n)):
+                if L[child] > L[largest]:
+                    largest = child
+            if not L[largest] > item:
+                break
+            L[i] = L[largest]
+            i = largest
+        L[i] = item
+        
+    def sift_up(self,i):
+        """Moves L[i] up towards the root while it is larger than its parent."""
+        L = self.L
+        d = self.d
+        item = L[i]
+        while i > 0:
+            parent = (i - 1)//d
+            if not item > L[parent]:
+                break
+            L[i] = L[parent]
+            i = parent
+        L[i] = item
+        
+    def max_heapify_list(self):
+        '''Max heapifies the entire list, starting from the last parent.'''
+        for i in range((self.n - 2)//self.d,-1,-1):
+            self.max_heapify(self.n,i)
+            
+    def save(self,path):
+        '''Saves the list, in heap order, and d to a binary snapshot file.'''
+        snapshot.save(path,self.L,snapshot.HEAP,arity=self.d)
+        
+    @classmethod
+    def load(cls,path,**kwargs):
+        '''Builds a heap from a snapshot file, with the d it was saved with
+            (unless d is given), kwargs go to the constructor.
+        '''
+        L, arity = snapshot.read(path,snapshot.HEAP)
+        if arity >= 2:
+            kwargs.setdefault('d',arity)
+        return cls(L,**kwargs)
+
+
+# h = DaryHeap([7,7,12,2,8,9,10],d=4)
+# print(h)
+# h.insert(20)
+# print(h.extract_max())
+# print(h)
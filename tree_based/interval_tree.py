@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interval tree
+
+An AVL tree of closed intervals [lo, hi], ordered by (lo, hi), where every
+node also stores max_hi: the largest hi in its subtree (CLRS chapter 14.3).
+max_hi is refreshed by update_subtree_info, so the AVL rotations and the
+rebalancing walk keep it correct after every insert and delete.
+
+The same interval may be inserted several times: a node stores the number of
+copies of its interval (count) and of all the intervals in its subtree
+(total). len, iteration and the overlap queries report every copy, while
+rank/select and the other AVL order statistics count distinct intervals.
+Likewise insert_many adds one copy of every interval of its batch, while
+delete_many removes every copy.
+
+    Overlap query [lo, hi]: an in-order walk which skips
+        - a whole subtree whose max_hi < lo (no interval in it reaches lo),
+        - everything after the first interval which starts after hi.
+    A pruned subtree costs nothing, but a subtree holding a match is entered,
+    so the walk visits the ancestors of every one of the k reported
+    intervals: O(min(N, k*log(N))) nodes (Theta(k*log(N/k)) when the matches
+    are spread through the tree), not O(log(N) + k). Reaching O(log(N) + k)
+    needs another structure, e.g. a centered interval tree or a priority
+    search tree.
+
+    Time complexity:
+        Insert, delete: O(log(N))
+        overlapping, stab: O(min(N, k*log(N))) for k intervals, lazily
+"""
+import itertools
+
+try:
+    from .AVL_tree import AVLNode, AVL, size
+    from .BST import iter_nodes
+    from . import snapshot
+except ImportError:
+    from AVL_tree import AVLNode, AVL, size
+    from BST import iter_nodes
+    import snapshot
+
+
+class IntervalNode(AVLNode):
+    """An AVL node whose key is an interval (lo, hi)."""
+    __slots__ = ('max_hi','count','total')
+
+    def __init__(self,key):
+        AVLNode.__init__(self,key)
+        self.max_hi = None if key is None else key[1]
+        self.count = 1
+        self.total = 1
+
+    def update_subtree_info(self):
+        """Updates the height, size, number of copies and the maximal endpoint
+            of the subtree
+        """
+        AVLNode.update_subtree_info(self)
+        self.max_hi = self.updated_max_hi()
+        self.total = self.updated_total()
+
+    def updated_total(self):
+        """Returns the number of copies of the intervals in the subtree"""
+        return self.count + total(self.left) + total(self.right)
+
+    def updated_max_hi(self):
+        """Returns the maximal endpoint of the subtree"""
+        max_hi = self.key[1]
+        if self.left is not None and self.left.max_hi > max_hi:
+            max_hi = self.left.max_hi
+        if self.right is not None and self.right.max_hi > max_hi:
+            max_hi = self.right.max_hi
+        return max_hi
+
+    def check_node_ri(self):
+        """Checks the interval and its subtree's maximal endpoint"""
+        if self.max_hi != self.updated_max_hi():
+            raise NameError('RI is violated by a wrong maximal endpoint')
+        if self.key[1] < self.key[0]:
+            raise NameError('RI is violated by an empty interval')
+        if self.count < 1 or self.total != self.updated_total():
+            raise NameError('RI is violated by a wrong number of copies')
+        return AVLNode.check_node_ri(self)
+
+
+def total(node):
+    """Returns the number of copies of the intervals in the subtree rooted at
+        node
+    """
+    if node is None:
+        return 0
+    else:
+        return node.total
+
+
+class IntervalTree(AVL):
+
+    def __init__(self,node_class = IntervalNode):
+        """Creates an empty interval tree"""
+        AVL.__init__(self,node_class)
+
+    def __len__(self):
+        """The number of intervals, counting every copy"""
+        return total(self.root)
+
+    def __iter__(self):
+        """Yields the intervals in (lo, hi) order, every copy of them"""
+        for node in iter_nodes(self.root):
+            for _ in range(node.count):
+                yield node.key
+
+    def check_items(self,items):
+        """Checks the order and the endpoints of a batch of intervals"""
+        items = AVL.check_items(self,items)
+        for lo, hi in items:
+            if hi < lo:
+                raise ValueError('An interval must satisfy lo <= hi')
+        return items
+
+    def set_item(self,node,item):
+        """insert_many adds a copy of an interval which is already present."""
+        node.count += 1
+
+    def save(self,path):
+        """Saves the intervals, every copy of them, to a snapshot file."""
+        snapshot.save(path,list(self),snapshot.SORTED)
+
+    @classmethod
+    def load(cls,path,**kwargs):
+        """Builds an interval tree from a snapshot file: the distinct intervals
+            with from_sorted, then the extra copies one at a time.
+        """
+        runs = [(key,len(list(copies))) for key, copies
+                in itertools.groupby(snapshot.load(path,snapshot.SORTED))]
+        tree = cls.from_sorted([key for key, _ in runs],**kwargs)
+        for key, copies in runs:
+            if copies > 1:
+                node = tree.find(key)
+                node.count = copies
+                tree.rebalance(node)
+        return tree
+
+    def count(self,lo,hi):
+        """Returns the number of copies of the interval [lo, hi]"""
+        node = self.find((lo,hi))
+        return 0 if node is None else node.count
+
+    def insert(self,lo,hi):
+        """Inserts a copy of the interval [lo, hi] and returns its node"""
+        if hi < lo:
+            raise ValueError('An interval must satisfy lo <= hi')
+        size_before = size(self.root)
+        node = AVL.insert(self,(lo,hi))
+        if size(self.root) == size_before:
+            node.count += 1
+            self.rebalance(node)
+        return node
+
+    def delete(self,lo,hi):
+        """Deletes a copy of the interval [lo, hi] (if present) and returns its
+            node
+        """
+        node = self.find((lo,hi))
+        if node is None:
+            return None
+        if node.count > 1:
+            node.count -= 1
+            self.rebalance(node)
+            return node
+        return self.delete_node(node)
+
+    def overlapping(self,lo,hi):
+        """Lazily yields the intervals (lo', hi') which overlap [lo, hi], that
+            is lo' <= hi and hi' >= lo, ordered by (lo', hi'). Reporting k
+            intervals takes O(min(N, k*log(N))).
+        """
+        stack = []
+        node = self.root
+        while True:
+            while node is not None and node.max_hi >= lo:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key[0] > hi:
+                return
+            if node.key[1] >= lo:
+                for _ in range(node.count):
+                    yield node.key
+            node = node.right
+
+    def stab(self,point):
+        """Lazily yields the intervals which contain point."""
+        return self.overlapping(point,point)
+
+
+# tree = IntervalTree()
+# for lo, hi in [(16,21),(8,9),(25,30),(5,8),(15,23),(17,19),(26,26),(0,3),(6,10),(19,20)]:
+#     tree.insert(lo,hi)
+# print(list(tree.overlapping(22,25)), list(tree.stab(8)))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pairing heap
+
+A heap ordered multiway tree. Every node keeps a pointer to its leftmost
+child, to its next sibling and to its previous sibling (or its parent, for
+the leftmost child).
+
+    Operations:
+        Link: compares two roots and makes the smaller one the leftmost child
+              of the larger one. Every other operation is built from it.
+
+        Insert/Meld: link the new node (or the other heap's root) with the root.
+
+        Extract max: removes the root and combines its children in two passes,
+              linking them in pairs from left to right and then linking the
+              results from right to left.
+
+        Increase key: cuts the node's subtree from its parent and links it
+              with the root.
+
+        Delete: cuts the node, combines its children as in extract max and
+              links the result with the root.
+
+    Time complexity (amortized):
+        Insert: O(1)
+        Meld: O(1)
+        Peek: O(1)
+        Increase key: O(1) (o(log(n)) proven, O(1) in practice)
+        Extract max/Delete: O(log(n))
+
+    Good for: workloads with many inserts and melds and few extractions,
+        e.g. merging many priority queues.
+"""
+
+
+class PairingNode(object):
+    """A node of the pairing heap, returned by insert as a handle."""
+    def __init__(self,key):
+        self.key = key
+        self.child = None     # leftmost child
+        self.sibling = None   # next sibling
+        self.prev = None      # previous sibling, or the parent
+
+    def __str__(self):
+        return str(self.key)
+
+
+class PairingHeap(object):
+
+    def __init__(self,L=()):
+        '''L is an iterable of keys.'''
+        self.root = None
+        self.n = 0
+        for key in L:
+            self.insert(key)
+
+    def __len__(self):
+        return self.n
+
+    def link(self,a,b):
+        """Links two roots and returns the root of the result."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b.key > a.key:
+            a, b = b, a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        b.prev = a
+        a.child = b
+        a.sibling = None
+        a.prev = None
+        return a
+
+    def cut(self,node):
+        """Detaches the subtree rooted at node from its parent."""
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.prev = None
+        node.sibling = None
+
+    def merge_pairs(self,first):
+        """Combines the sibling list starting at first into one tree (two pass
+            pairing) and returns its root.
+        """
+        pairs = []
+        while first is not None:
+            a = first
+            b = a.sibling
+            if b is None:
+                first = None
+            else:
+                first = b.sibling
+            a.sibling = a.prev = None
+            if b is not None:
+                b.sibling = b.prev = None
+            pairs.append(self.link(a,b))
+        root = None
+        for tree in reversed(pairs):
+            root = self.link(tree,root)
+        return root
+
+    def insert(self,key):
+        """Inserts key and returns its node."""
+        node = PairingNode(key)
+        self.root = self.link(self.root,node)
+        self.n += 1
+        return node
+
+    def peek(self):
+        '''Returns the maximum key.'''
+        if self.root is None:
+            raise IndexError('peek on an empty heap')
+        return self.root.key
+
+    def extract_max(self):
+        '''Removes and returns the maximum key.'''
+        root = self.root
+        if root is None:
+            raise IndexError('extract_max on an empty heap')
+        self.root = self.merge_pairs(root.child)
+        root.child = None
+        self.n -= 1
+        return root.key
+
+    def delete(self,node):
+        '''Deletes node from the heap.'''
+        if node is self.root:
+            self.extract_max()
+            return
+        self.cut(node)
+        subtree = self.merge_pairs(node.child)
+        node.child = None
+        self.root = self.link(self.root,subtree)
+        self.n -= 1
+
+    def increase_key(self,node,key):
+        '''Raises the key of node, the cheap direction for a max heap.'''
+        if key < node.key:
+            raise ValueError('The new key is smaller than the current one')
+        node.key = key
+        if node is not self.root:
+            self.cut(node)
+            self.root = self.link(self.root,node)
+
+    def meld(self,other):
+        '''Moves all the nodes of the PairingHeap other into this heap in O(1).
+            other is left empty.
+        '''
+        self.root = self.link(self.root,other.root)
+        self.n += other.n
+        other.root = None
+        other.n = 0
+
+
+# h = PairingHeap([7,7,12,2,8,9,10])
+# node = h.insert(3)
+# h.increase_key(node,20)
+# print(h.extract_max(), h.peek(), len(h))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent AVL tree
+
+An AVL tree whose nodes are never modified after they are created. insert and
+delete copy only the nodes on the path from the root to the change (and the
+few nodes touched by rotations), and return a new tree which shares every
+other subtree with the old one. Every version stays valid forever.
+
+    A version costs O(log(N)) new nodes, and holding on to an old version is
+    free. A writer can therefore publish the newest version by assigning it to
+    a shared variable (a single atomic reference assignment), while readers
+    iterate over the version they picked up, without locks or copies.
+
+    Nodes have no parent pointers (a shared subtree has many parents), so the
+    traversals use BST.iter_nodes, which keeps its own stack.
+
+    Time complexity:
+        Search, insert, delete, min/max: O(log(N))
+        Snapshot: O(1)
+"""
+try:
+    from .BST import iter_nodes
+except ImportError:
+    from BST import iter_nodes
+
+
+class PersistentNode(object):
+    """An immutable AVL node"""
+    __slots__ = ('key','left','right','height','size')
+
+    def __init__(self,key,left=None,right=None):
+        self.key = key
+        self.left = left
+        self.right = right
+        self.height = 1 + max(height(left),height(right))
+        self.size = 1 + size(left) + size(right)
+
+    def __str__(self):
+        return str(self.key)
+
+
+def height(node):
+    """Returns the height of the the node"""
+    if node is None:
+        return -1
+    else:
+        return node.height
+
+
+def size(node):
+    """Returns the number of nodes in the subtree rooted at node"""
+    if node is None:
+        return 0
+    else:
+        return node.size
+
+
+def balance(key,left,right):
+    """Returns a new node with the given key and children, rotated if the
+        children's heights differ by 2.
+    """
+    if height(left) >= 2 + height(right):
+        if height(left.left) >= height(left.right):
+            return PersistentNode(left.key,left.left,
+                                  PersistentNode(key,left.right,right))
+        middle = left.right
+        return PersistentNode(middle.key,
+                              PersistentNode(left.key,left.left,middle.left),
+                              PersistentNode(key,middle.right,right))
+    if height(right) >= 2 + height(left):
+        if height(right.right) >= height(right.left):
+            return PersistentNode(right.key,
+                                  PersistentNode(key,left,right.left),
+                                  right.right)
+        middle = right.left
+        return PersistentNode(middle.key,
+                              PersistentNode(key,left,middle.left),
+                              PersistentNode(right.key,middle.right,right.right))
+    return PersistentNode(key,left,right)
+
+
+def insert(node,key):
+    """Returns the root of the subtree rooted at node with key inserted (node
+        itself if key is already there).
+    """
+    if node is None:
+        return PersistentNode(key)
+    if key < node.key:
+        left = insert(node.left,key)
+        if left is node.left:
+            return node
+        return balance(node.key,left,node.right)
+    if key > node.key:
+        right = insert(node.right,key)
+        if right is node.right:
+            return node
+        return balance(node.key,node.left,right)
+    return node
+
+
+def delete_min(node):
+    """Returns the root of the subtree rooted at node without its minimum"""
+    if node.left is None:
+        return node.right
+    return balance(node.key,delete_min(node.left),node.right)
+
+
+def delete(node,key):
+    """Returns the root of the subtree rooted at node with key removed (node
+        itself if key is not there).
+    """
+    if node is None:
+        return None
+    if key < node.key:
+        left = delete(node.left,key)
+        if left is node.left:
+            return node
+        return balance(node.key,left,node.right)
+    if key > node.key:
+        right = delete(node.right,key)
+        if right is node.right:
+            return node
+        return balance(node.key,node.left,right)
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    successor = node.right
+    while successor.left is not None:
+        successor = successor.left
+    return balance(successor.key,node.left,delete_min(node.right))
+
+
+class PersistentAVL(object):
+    """An immutable version of an AVL tree. insert and delete return a new
+        PersistentAVL and leave this one unchanged.
+    """
+
+    def __init__(self,root=None):
+        self.root = root
+
+    def __len__(self):
+        return size(self.root)
+
+    def __contains__(self,key):
+        return self.find(key) is not None
+
+    def __iter__(self):
+        """Yields the keys in ascending order."""
+        for node in iter_nodes(self.root):
+            yield node.key
+
+    def __reversed__(self):
+        """Yields the keys in descending order."""
+        for node in iter_nodes(self.root,reverse=True):
+            yield node.key
+
+    def iter_range(self,lo=None,hi=None,inclusive=True):
+        """Lazily yields the keys k with lo <= k <= hi in ascending order
+            (see BST.iter_range).
+        """
+        for node in iter_nodes(self.root,lo,hi,inclusive):
+            yield node.key
+
+    def insert(self,key):
+        """Returns a version of the tree which also contains key."""
+        root = insert(self.root,key)
+        return self if root is self.root else PersistentAVL(root)
+
+    def delete(self,key):
+        """Returns a version of the tree without key."""
+        root = delete(self.root,key)
+        return self if root is self.root else PersistentAVL(root)
+
+    def find(self,key):
+        """Returns the node with the given key, or None."""
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node
+            node = node.left if key < node.key else node.right
+        return None
+
+    def min(self):
+        node = self.root
+        while node is not None and node.left is not None:
+            node = node.left
+        return node
+
+    def check_ri(self):
+        """Checks the BST order, the balance, the heights and the sizes."""
+        stack = [(self.root,None,None)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if node is None:
+                continue
+            if (lo is not None and not node.key > lo) or (hi is not None and not node.key < hi):
+                raise NameError('RI is violated by the key order')
+            if abs(height(node.left) - height(node.right)) >= 2:
+                raise NameError('RI violated by unbalanced node height')
+            if node.height != 1 + max(height(node.left),height(node.right)):
+                raise NameError('RI is violated by wrong node height')
+            if node.size != 1 + size(node.left) + size(node.right):
+                raise NameError('RI is violated by wrong subtree size')
+            stack.append((node.left,lo,node.key))
+            stack.append((node.right,node.key,hi))
+        return True
+
+
+# v1 = PersistentAVL()
+# for key in [10,11,18,6,2]:
+#     v1 = v1.insert(key)
+# v2 = v1.delete(10)
+# print(list(v1), list(v2), v2.check_ri())
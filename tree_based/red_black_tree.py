@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Red-black tree
+
+A binary search tree in which every node is colored red or black, such that:
+    1. The root is black.
+    2. A red node has no red children.
+    3. Every path from a node down to a missing (None) child passes through
+       the same number of black nodes (the black height).
+These rules keep the height below 2*log(N+1).
+
+Compared to the AVL tree, the balance is looser: after an insert or delete
+the tree is repaired mostly by recoloring, with at most 2 rotations per
+insert and 3 per delete. This makes it a good fit for write heavy workloads,
+while lookups are slightly slower since the tree can be deeper.
+The implementation follows CLRS chapter 13, with None in place of the
+sentinel leaf.
+
+    Time complexity:
+        Search, insert, delete, min/max, successor: O(log(N))
+        Rotations per update: O(1)
+"""
+try:
+    from .BST import BSTNode, BST
+except ImportError:
+    from BST import BSTNode, BST
+
+RED = True
+BLACK = False
+
+
+class RBNode(BSTNode):
+    __slots__ = ('color',)
+
+    def __init__(self,key):
+        """Creates a red node, ready to be inserted into the tree"""
+        BSTNode.__init__(self,key)
+        self.color = RED
+
+    def check_node_ri(self):
+        """Checks that a red node has no red children"""
+        if self.color == RED and (color(self.left) == RED or color(self.right) == RED):
+            raise NameError('RI is violated by a red node with a red child')
+        return BSTNode.check_node_ri(self)
+
+
+def color(node):
+    """Returns the color of the node, missing nodes are black"""
+    if node is None:
+        return BLACK
+    else:
+        return node.color
+
+
+class RedBlackTree(BST):
+
+    def __init__(self,node_class = RBNode):
+        """Creates an empty red-black tree"""
+        BST.__init__(self,node_class)
+
+    def insert(self,key):
+        """Inserts key as a red leaf and restores the red-black properties"""
+        node = self.node_class(key)
+        if self.root is None:
+            self.root = node
+        else:
+            inserted_node = self.root.insert(node)
+            if inserted_node is not node:
+                return inserted_node
+        self.insert_fixup(node)
+        return node
+
+    def insert_fixup(self,z):
+        """Fixes a red node z with a red parent by recoloring, moving the
+            violation up the tree, or by at most two rotations.
+        """
+        while color(z.parent) == RED:
+            parent = z.parent
+            grandparent = parent.parent
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                if color(uncle) == RED:
+                    parent.color = BLACK
+                    uncle.color = BLACK
+                    grandparent.color = RED
+                    z = grandparent
+                else:
+                    if z is parent.right:
+                        z = parent
+                        self.left_rotate(z)
+                        parent = z.parent
+                    parent.color = BLACK
+                    grandparent.color = RED
+                    self.right_rotate(grandparent)
+            else:
+                uncle = grandparent.left
+                if color(uncle) == RED:
+                    parent.color = BLACK
+                    uncle.color = BLACK
+                    grandparent.color = RED
+                    z = grandparent
+                else:
+                    if z is parent.left:
+                        z = parent
+                        self.right_rotate(z)
+                        parent = z.parent
+                    parent.color = BLACK
+                    grandparent.color = RED
+                    self.left_rotate(grandparent)
+        self.root.color = BLACK
+
+    def transplant(self,u,v):
+        """Replaces the subtree rooted at u with the subtree rooted at v"""
+        if u.parent is None:
+            self.root = v
+        elif u is u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        if v is not None:
+            v.parent = u.parent
+
+    def delete_node(self,z):
+        """Deletes node z and restores the red-black properties"""
+        removed_color = z.color
+        if z.left is None:
+            x, x_parent = z.right, z.parent
+            self.transplant(z,z.right)
+        elif z.right is None:
+            x, x_parent = z.left, z.parent
+            self.transplant(z,z.left)
+        else:
+            y = z.right.find_min()
+            removed_color = y.color
+            x = y.right
+            if y.parent is z:
+                x_parent = y
+            else:
+                x_parent = y.parent
+                self.transplant(y,y.right)
+                y.right = z.right
+                y.right.parent = y
+            self.transplant(z,y)
+            y.left = z.left
+            y.left.parent = y
+            y.color = z.color
+        if removed_color == BLACK:
+            self.delete_fixup(x,x_parent)
+        z.parent = z.left = z.right = None
+        return z
+
+    def delete_fixup(self,x,parent):
+        """Removes the extra black carried by x (possibly None) whose parent is
+            parent, by recoloring and at most three rotations.
+        """
+        while x is not self.root and color(x) == BLACK:
+            if x is parent.left:
+                w = parent.right
+                if color(w) == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self.left_rotate(parent)
+                    w = parent.right
+                if color(w.left) == BLACK and color(w.right) == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
+                else:
+                    if color(w.right) == BLACK:
+                        w.left.color = BLACK
+                        w.color = RED
+                        self.right_rotate(w)
+                        w = parent.right
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.right.color = BLACK
+                    self.left_rotate(parent)
+                    x = self.root
+            else:
+                w = parent.left
+                if color(w) == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self.right_rotate(parent)
+                    w = parent.left
+                if color(w.left) == BLACK and color(w.right) == BLACK:
+                    w.color = RED
+                    x = parent
+                    parent = x.parent
+                else:
+                    if color(w.left) == BLACK:
+                        w.right.color = BLACK
+                        w.color = RED
+                        self.left_rotate(w)
+                        w = parent.left
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.left.color = BLACK
+                    self.right_rotate(parent)
+                    x = self.root
+        if x is not None:
+            x.color = BLACK
+
+    def check_ri(self):
+        """Checks the BST and red-black properties of the whole tree"""
+        if self.root is None:
+            return True
+        if self.root.color != BLACK:
+            raise NameError('RI is violated by a red root')
+        black_height = None
+        stack = [(self.root,0)]
+        while stack:
+            node, blacks = stack.pop()
+            if node is None:
+                if black_height is None:
+                    black_height = blacks
+                elif blacks != black_height:
+                    raise NameError('RI is violated by unequal black heights')
+                continue
+            blacks += color(node) == BLACK
+            stack.append((node.left,blacks))
+            stack.append((node.right,blacks))
+        return BST.check_ri(self)
+
+
+# tree = RedBlackTree()
+# for key in [10,11,18,6,2,7,15]:
+#     tree.insert(key)
+# tree.delete(10)
+# print(list(tree), tree.check_ri())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Snapshot
+
+A compact binary file format for the keys of a tree or a heap, used by
+AVL.save/load and Heap.save/load (and their subclasses).
+
+    Layout:
+        header (16 bytes, little endian):
+            magic b'DSNP', version (1 byte), order (1 byte, see below),
+            typecode (1 byte), arity (1 byte, the d of a d-ary heap, 0 for
+            anything else), number of keys (8 bytes)
+        payload:
+            typecode 'q': the keys as int64, 8 bytes each, little endian
+            typecode 'd': the keys as float64, 8 bytes each, little endian
+            typecode 'p': a pickle of the list of keys (any other keys)
+
+    Loading numeric keys memory-maps the file and converts the payload in a
+    single C loop (memoryview.tolist), without parsing or unpickling.
+    The keys are stored in the order of the structure (sorted for a tree,
+    array order for a heap) so that the linear time builders can be used on
+    load: AVL.from_sorted and the O(n) heapify.
+    
+    Orders:
+        SORTED: keys in ascending order (AVL, IntervalTree)
+        HEAP: keys in heap order (Heap, DaryHeap, LazyHeap)
+        SORTED_ITEMS: (key, value) pairs in key order (SortedDict)
+        HEAP_ITEMS: (priority, item) pairs in heap order (AddressableHeap)
+    Loading checks the order, so a snapshot is only read back by the kind of
+    structure which wrote it.
+
+    Security: a 'p' payload is read with pickle.load, and unpickling can run
+    arbitrary code. Only load snapshots from trusted sources; the header
+    check does not make an untrusted file safe.
+"""
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+MAGIC = b'DSNP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBcBQ')
+
+SORTED = 0
+HEAP = 1
+SORTED_ITEMS = 2
+HEAP_ITEMS = 3
+
+INT64_MIN = -2**63
+INT64_MAX = 2**63 - 1
+
+
+def typecode_of(keys):
+    """Returns 'q' if every key is an int64, 'd' if every key is a float and
+        'p' (pickle) otherwise.
+    """
+    if all(type(key) is int for key in keys):
+        if not keys or (INT64_MIN <= min(keys) and max(keys) <= INT64_MAX):
+            return 'q'
+    elif all(type(key) is float for key in keys):
+        return 'd'
+    return 'p'
+
+
+def save(path,keys,order,arity=0):
+    """Writes the list keys to path. order is one of the orders above."""
+    if not 0 <= arity <= 255:
+        raise ValueError('A snapshot stores an arity of at most 255')
+    typecode = typecode_of(keys)
+    with open(path,'wb') as f:
+        f.write(HEADER.pack(MAGIC,VERSION,order,typecode.encode(),arity,len(keys)))
+        if typecode == 'p':
+            pickle.dump(keys,f,protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            payload = array(typecode,keys)
+            if sys.byteorder == 'big':
+                payload.byteswap()
+            payload.tofile(f)
+
+
+def load(path,order):
+    """Reads the list of keys saved in path, checking that it was saved with
+        the given order. path must be trusted: a pickled payload is
+        unpickled, which can run arbitrary code.
+    """
+    return read(path,order)[0]
+
+
+def read(path,order):
+    """Returns the list of keys saved in path and the arity saved with it,
+        checking that they were saved with the given order. path must be
+        trusted (see load).
+    """
+    with open(path,'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f'{path} is not a snapshot')
+        magic, version, saved_order, typecode, arity, n = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a snapshot')
+        if saved_order != order:
+            raise ValueError(f'{path} holds a snapshot of another structure')
+        typecode = typecode.decode()
+        if typecode == 'p':
+            return pickle.load(f), arity
+        if n == 0:
+            return [], arity
+        if sys.byteorder == 'big':
+            payload = array(typecode)
+            payload.fromfile(f,n)
+            payload.byteswap()
+            return payload.tolist(), arity
+        with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                end = HEADER.size + 8*n
+                if len(view) < end:
+                    raise ValueError(f'{path} is truncated')
+                with view[HEADER.size:end].cast(typecode) as payload:
+                    return payload.tolist(), arity
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorted dict
+
+A key -> value map stored in an AVL tree, so the keys are kept in sorted
+order. Every node holds its key and its value, which means lookups,
+assignments and deletions each take a single O(log(N)) descent.
+
+    Operations:
+        d[key], d[key] = value, del d[key], get, pop, setdefault,
+        items, values, and everything an AVL tree supports on the keys
+        (iteration in order, iter_range, rank, select, min...).
+        The batch methods from_sorted and insert_many take (key, value)
+        pairs sorted by key, and insert_many replaces existing values like
+        an assignment; delete_many and find_many take keys.
+
+    Multiset mode (SortedDict(multiset=True)):
+        The value of a key is the number of copies of it. add increments it,
+        remove decrements it and deletes the key when it reaches 0.
+        add, remove, count and elements raise TypeError in plain mode, and
+        in multiset mode every value stored must be a positive int.
+"""
+try:
+    from .AVL_tree import AVL, AVLNode
+    from .BST import iter_nodes
+    from . import snapshot
+except ImportError:
+    from AVL_tree import AVL, AVLNode
+    from BST import iter_nodes
+    import snapshot
+
+
+class MapNode(AVLNode):
+    """An AVL node which also stores a value."""
+    __slots__ = ('value',)
+
+    def __init__(self,key,value=None):
+        AVLNode.__init__(self,key)
+        self.value = value
+
+
+_missing = object()
+
+
+class SortedDict(AVL):
+
+    def __init__(self,items=(),multiset=False,node_class=MapNode):
+        """Creates a sorted dict from an iterable of (key, value) pairs (or of
+            keys, in multiset mode).
+        """
+        AVL.__init__(self,node_class)
+        self.multiset = multiset
+        for item in items:
+            if multiset:
+                self.add(item)
+            else:
+                key, value = item
+                self[key] = value
+
+    def __repr__(self):
+        return type(self).__name__ + '({' + ', '.join(
+            f'{key!r}: {value!r}' for key, value in self.items()) + '})'
+
+    def __contains__(self,key):
+        return self.find(key) is not None
+
+    def _find_or_insert(self,key,value):
+        """Descends once, and returns the node of key together with whether it
+            was just inserted (with the given value).
+        """
+        node = self.node_class(key,value)
+        if self.root is None:
+            self.root = node
+            return node, True
+        found = self.root.insert(node)
+        if found is node:
+            self.rebalance(node)
+            return node, True
+        return found, False
+
+    def _require_multiset(self,operation):
+        """Raises TypeError unless the dict is in multiset mode."""
+        if not self.multiset:
+            raise TypeError(f'{operation} is only supported in multiset mode')
+    
+    def _check_count(self,value):
+        """In multiset mode, raises ValueError unless value is a valid count."""
+        if self.multiset and (type(value) is not int or value <= 0):
+            raise ValueError(f'A multiset count must be a positive int, not {value!r}')
+
+    def item_key(self,item):
+        """The items of from_sorted and load are (key, value) pairs."""
+        return item[0]
+    
+    def new_node(self,item):
+        """Returns a new detached node for a (key, value) pair."""
+        key, value = item
+        return self.node_class(key,value)
+    
+    def check_items(self,items):
+        """Checks the keys, and the counts in multiset mode, of a batch before
+            any of it is inserted.
+        """
+        items = AVL.check_items(self,items)
+        if self.multiset:
+            for _, value in items:
+                self._check_count(value)
+        return items
+    
+    def set_item(self,node,item):
+        """insert_many replaces the values of the keys already present."""
+        self.set_value(node,item[1])
+    
+    def save(self,path):
+        """Saves the (key, value) pairs, in key order, to a snapshot file."""
+        snapshot.save(path,list(self.items()),snapshot.SORTED_ITEMS)
+        
+    @classmethod
+    def load(cls,path,**kwargs):
+        """Builds a sorted dict from a snapshot file in O(N), with from_sorted.
+            kwargs go to the constructor (e.g. multiset, or the monoid of an
+            AggregateTree, which is not saved).
+        """
+        return cls.from_sorted(snapshot.load(path,snapshot.SORTED_ITEMS),**kwargs)
+
+    def set_value(self,node,value):
+        """Replaces the value of a node already in the tree. Subclasses whose
+            nodes summarize their subtree's values extend it.
+        """
+        node.value = value
+
+    def __getitem__(self,key):
+        node = self.find(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self,key,value):
+        self._check_count(value)
+        node, inserted = self._find_or_insert(key,value)
+        if not inserted:
+            self.set_value(node,value)
+
+    def __delitem__(self,key):
+        node = self.find(key)
+        if node is None:
+            raise KeyError(key)
+        self.delete_node(node)
+
+    def insert(self,key,value=None):
+        """Inserts key (with value) if it is absent and returns its node."""
+        self._check_count(value)
+        return self._find_or_insert(key,value)[0]
+
+    def get(self,key,default=None):
+        node = self.find(key)
+        return default if node is None else node.value
+
+    def pop(self,key,default=_missing):
+        """Removes key and returns its value (or default if key is absent)."""
+        node = self.find(key)
+        if node is None:
+            if default is _missing:
+                raise KeyError(key)
+            return default
+        self.delete_node(node)
+        return node.value
+
+    def setdefault(self,key,default=None):
+        """Returns the value of key, inserting it with default if absent."""
+        self._check_count(default)
+        return self._find_or_insert(key,default)[0].value
+
+    def items(self):
+        """Lazily yields the (key, value) pairs in key order."""
+        for node in iter_nodes(self.root):
+            yield node.key, node.value
+
+    def values(self):
+        """Lazily yields the values in key order."""
+        for node in iter_nodes(self.root):
+            yield node.value
+
+    def add(self,key,count=1):
+        """Multiset mode: adds count copies of key."""
+        self._require_multiset('add')
+        self._check_count(count)
+        node, inserted = self._find_or_insert(key,count)
+        if not inserted:
+            self.set_value(node,node.value + count)
+
+    def remove(self,key,count=1):
+        """Multiset mode: removes count copies of key (all of them if fewer)."""
+        self._require_multiset('remove')
+        self._check_count(count)
+        node = self.find(key)
+        if node is None:
+            raise KeyError(key)
+        if node.value > count:
+            self.set_value(node,node.value - count)
+        else:
+            self.delete_node(node)
+
+    def count(self,key):
+        """Multiset mode: the number of copies of key."""
+        self._require_multiset('count')
+        return self.get(key,0)
+
+    def elements(self):
+        """Multiset mode: lazily yields every key as many times as its count."""
+        self._require_multiset('elements')
+        return (node.key for node in iter_nodes(self.root)
+                for _ in range(node.value))
+
+
+# d = SortedDict([(3,'c'),(1,'a')])
+# d[2] = 'b'
+# print(d, d.pop(1), d.setdefault(5,'e'), list(d.items()))
+# m = SortedDict([3,1,3],multiset=True)
+# print(m.count(3), list(m.elements()))
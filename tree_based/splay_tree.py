@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Splay tree
+
+A self-adjusting binary search tree (Sleator and Tarjan). It keeps no balance
+information; instead every find, insert and delete splays the accessed node:
+rotates it up to the root. Along the way the nodes on its access path are
+moved about halfway closer to the root, so frequently and recently accessed
+keys stay near the top.
+
+    Splay step, for a node x with parent p and grandparent g:
+        zig: p is the root, rotate x over p.
+        zig-zig: x and p are both left (or both right) children, rotate p
+            over g first, then x over p.
+        zig-zag: otherwise, rotate x over p and then x over g.
+
+    Time complexity (amortized):
+        Search, insert, delete: O(log(N)), and a key accessed k times out of
+        m accesses costs O(log(m/k)), close to O(1) for a hot key.
+        A single operation may take O(N) (e.g. after sorted inserts).
+"""
+try:
+    from .BST import BSTNode, BST
+except ImportError:
+    from BST import BSTNode, BST
+
+
+def rotate_up(x):
+    """Rotates x above its parent. Splay trees keep no subtree info, so unlike
+        BST.left_rotate/right_rotate there is nothing to update.
+    """
+    p = x.parent
+    g = p.parent
+    if x is p.left:
+        p.left = x.right
+        if x.right is not None:
+            x.right.parent = p
+        x.right = p
+    else:
+        p.right = x.left
+        if x.left is not None:
+            x.left.parent = p
+        x.left = p
+    p.parent = x
+    x.parent = g
+    if g is not None:
+        if g.left is p:
+            g.left = x
+        else:
+            g.right = x
+
+
+class SplayTree(BST):
+
+    def __init__(self,node_class = BSTNode):
+        """Creates an empty splay tree"""
+        BST.__init__(self,node_class)
+
+    def splay(self,x):
+        """Rotates x up to the root by zig, zig-zig and zig-zag steps."""
+        while x.parent is not None:
+            p = x.parent
+            g = p.parent
+            if g is None:
+                rotate_up(x)
+            elif (x is p.left) == (p is g.left):
+                rotate_up(p)
+                rotate_up(x)
+            else:
+                rotate_up(x)
+                rotate_up(x)
+        self.root = x
+
+    def find(self,key):
+        """Returns the node with the given key, or None. The node (or the
+            last node visited, if key is absent) is splayed to the root.
+        """
+        node = self.root
+        last = None
+        while node is not None:
+            last = node
+            if key == node.key:
+                break
+            node = node.left if key < node.key else node.right
+        if last is not None:
+            self.splay(last)
+        return node
+
+    def insert(self,key):
+        """Inserts key (if absent), splays its node and returns it"""
+        node = BST.insert(self,key)
+        self.splay(node)
+        return node
+
+    def delete_node(self,node):
+        """Deletes node, which must belong to this tree, and returns it. node
+            is splayed to the root, and its subtrees are joined by splaying
+            the maximum of the left one.
+        """
+        self.splay(node)
+        left, right = node.left, node.right
+        node.left = node.right = None
+        if right is not None:
+            right.parent = None
+        if left is None:
+            self.root = right
+        else:
+            left.parent = None
+            self.root = left
+            maximum = left.find_max()
+            self.splay(maximum)
+            maximum.right = right
+            if right is not None:
+                right.parent = maximum
+        return node
+
+
+# tree = SplayTree()
+# for key in [10,11,18,6,2,7,15,3,1]:
+#     tree.insert(key)
+# tree.find(7)
+# tree.delete(10)
+# print(tree.root, list(tree), tree.check_ri())